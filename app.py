@@ -1,5 +1,8 @@
 import os
+import atexit
+import queue
 import logging
+from logging.handlers import RotatingFileHandler, QueueHandler, QueueListener
 import streamlit as st
 
 # Импортируем модули
@@ -21,35 +24,61 @@ def setup_logging():
     """
     # Настраиваем корневой логгер
     root_logger = logging.getLogger()
-    root_logger.setLevel(logging.INFO)
     
-    # Проверяем, есть ли уже обработчики, чтобы избежать дублирования
+    # Streamlit выполняет app.py заново при каждом взаимодействии, поэтому флаг готовности
+    # хранится на корневом логгере, который переживает перезапуски скрипта
+    if getattr(root_logger, "_app_logging_ready", False):
+        return
+    
+    # Уровень задается переменной окружения LOG_LEVEL (по умолчанию INFO): при более высоком
+    # уровне сообщения, в том числе трассировки logger.exception, отбрасываются без форматирования
+    log_level = getattr(logging, os.environ.get("LOG_LEVEL", "INFO").upper(), logging.INFO)
+    root_logger.setLevel(log_level)
+    
+    # Устанавливаем формат сообщений
+    formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    
+    # Консольный обработчик обычно уже добавлен logging.basicConfig при импорте модулей,
+    # поэтому создаем его, только если обработчиков нет, чтобы избежать дублирования
     if not root_logger.handlers:
         # Создаем обработчик для вывода в консоль
         console_handler = logging.StreamHandler()
-        console_handler.setLevel(logging.INFO)
-        
-        # Устанавливаем формат сообщений
-        formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+        console_handler.setLevel(log_level)
         console_handler.setFormatter(formatter)
         
         # Добавляем обработчик к логгеру
         root_logger.addHandler(console_handler)
-        
-        # Создаем директорию для логов, если её нет
-        log_dir = "logs"
-        if not os.path.exists(log_dir):
-            os.makedirs(log_dir)
-        
-        # Создаем обработчик для записи в файл
-        try:
-            file_handler = logging.FileHandler(f"{log_dir}/app.log")
-            file_handler.setLevel(logging.INFO)
-            file_handler.setFormatter(formatter)
-            root_logger.addHandler(file_handler)
-        except Exception as e:
-            print(f"Не удалось настроить логирование в файл: {e}")
     
+    # Создаем директорию для логов, если её нет
+    log_dir = "logs"
+    
+    # Создаем обработчик для записи в файл с ротацией, чтобы лог не рос без ограничений.
+    # Он добавляется независимо от консольного: повторная настройка исключена флагом готовности
+    try:
+        os.makedirs(log_dir, exist_ok=True)
+        file_handler = RotatingFileHandler(f"{log_dir}/app.log", maxBytes=10_000_000, backupCount=3, encoding="utf-8")
+        file_handler.setLevel(log_level)
+        file_handler.setFormatter(formatter)
+        root_logger.addHandler(file_handler)
+    except Exception as e:
+        logger.warning(f"Не удалось настроить логирование в файл: {e}")
+    
+    # Запись в консоль и файл выполняется в фоновом потоке QueueListener: рабочие потоки
+    # только кладут запись в очередь и не ждут write()/flush() на диске
+    handlers = list(root_logger.handlers)
+    for handler in handlers:
+        root_logger.removeHandler(handler)
+    log_queue = queue.Queue(-1)
+    root_logger.addHandler(QueueHandler(log_queue))
+    listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    listener.start()
+    
+    # Слушатель общий для всего процесса, поэтому хранится на корневом логгере (как и флаг
+    # готовности), а не в session_state; при завершении процесса оставшиеся записи дописываются
+    root_logger._app_log_listener = listener
+    atexit.register(listener.stop)
+    
+    root_logger._app_logging_ready = True
     logger.info("Логирование настроено успешно")
 
 def main():
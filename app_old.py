@@ -18,13 +18,16 @@ from io import BytesIO
 import re
 
 from youtube_scraper import YouTubeAnalyzer
-from utils import parse_youtube_url
+from utils import parse_youtube_url, html_links, parse_links, read_uploaded_links, throttled_status_updaters, is_clean_watch_url
 
 # Настройка логирования
 logging.basicConfig(level=logging.INFO, 
                     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Скомпилированный шаблон для отбора ссылок YouTube из введенных списков
+_YT_RE = re.compile(r"youtube\.com|youtu\.be")
+
 # Функция для загрузки API ключа из secrets.toml
 def load_api_key_from_secrets():
     """
@@ -91,7 +94,70 @@ def setup_logging():
     
     logger.info("Логирование настроено успешно")
 
-# Функция для фильтрации видео по дате
+def build_filter_mask(df: pd.DataFrame, max_days: int = 0, min_views: int = 0,
+                      search_query: str = "") -> pd.Series:
+    """
+    Строит одну булеву маску для всех фильтров таблицы видео (дата, просмотры, поиск).
+    Условия вычисляются векторно, а таблица копируется один раз при применении маски.
+    
+    Args:
+        df (pd.DataFrame): DataFrame с данными о видео.
+        max_days (int): Максимальное количество дней с момента публикации (0 - без фильтра).
+        min_views (int): Минимальное количество просмотров (0 - без фильтра).
+        search_query (str): Поисковый запрос по заголовку (пустой - без фильтра).
+        
+    Returns:
+        pd.Series: Маска строк, прошедших все фильтры.
+    """
+    mask = pd.Series(True, index=df.index)
+    
+    if max_days > 0 and "Дата публикации" in df.columns:
+        try:
+            # "Прошло не больше max_days полных дней" - та же граница, что в module_recommendations
+            cutoff = pd.Timestamp.now() - pd.Timedelta(days=max_days + 1)
+            mask &= pd.to_datetime(df["Дата публикации"], errors="coerce") > cutoff
+        except Exception as e:
+            logger.error(f"Ошибка при фильтрации по дате: {e}")
+    
+    if min_views > 0 and "Количество просмотров" in df.columns:
+        try:
+            views_col = df["Количество просмотров"]
+            if not pd.api.types.is_numeric_dtype(views_col):
+                numeric_views = pd.to_numeric(views_col, errors="coerce")
+                # Регулярное выражение применяется только к нераспознанным значениям
+                # (строки с разделителями разрядов, например "1 234 567")
+                unparsed = numeric_views.isna() & views_col.notna()
+                if unparsed.any():
+                    numeric_views[unparsed] = pd.to_numeric(
+                        views_col[unparsed].astype(str).str.replace(r'\D', '', regex=True), errors="coerce"
+                    )
+                views_col = numeric_views
+            mask &= views_col >= min_views
+        except Exception as e:
+            logger.error(f"Ошибка при фильтрации по просмотрам: {e}")
+    
+    if search_query and search_query.strip() and "Заголовок видео" in df.columns:
+        mask &= df["Заголовок видео"].str.contains(search_query, case=False, regex=False, na=False)
+    
+    return mask
+
+def filter_videos_df(df: pd.DataFrame, max_days: int = 0, min_views: int = 0,
+                     search_query: str = "") -> pd.DataFrame:
+    """
+    Применяет все фильтры таблицы видео за один проход.
+    
+    Args:
+        df (pd.DataFrame): DataFrame с данными о видео.
+        max_days (int): Максимальное количество дней с момента публикации.
+        min_views (int): Минимальное количество просмотров.
+        search_query (str): Поисковый запрос по заголовку.
+        
+    Returns:
+        pd.DataFrame: Отфильтрованный DataFrame.
+    """
+    return df.loc[build_filter_mask(df, max_days, min_views, search_query)]
+
+# Функции отдельных фильтров оставлены для совместимости и работают через общую маску
 def filter_by_date(df: pd.DataFrame, max_days: int) -> pd.DataFrame:
     """
     Фильтрует DataFrame по дате публикации.
@@ -103,34 +169,8 @@ def filter_by_date(df: pd.DataFrame, max_days: int) -> pd.DataFrame:
     Returns:
         pd.DataFrame: Отфильтрованный DataFrame.
     """
-    if max_days <= 0 or "Дата публикации" not in df.columns:
-        return df
-    
-    # Преобразуем строки даты в datetime объекты и фильтруем
-    try:
-        # Проверяем формат даты, если это строка
-        if pd.api.types.is_string_dtype(df["Дата публикации"]):
-            # Преобразуем в datetime
-            df_with_date = df.copy()
-            df_with_date["temp_date"] = pd.to_datetime(df["Дата публикации"], errors="coerce")
-            
-            # Расчитываем дни с публикации
-            now = datetime.now()
-            days_since = (now - df_with_date["temp_date"]).dt.days
-            
-            # Фильтруем
-            mask = days_since <= max_days
-            return df_with_date[mask].drop(columns=["temp_date"])
-        else:
-            # Если дата уже в формате datetime
-            now = datetime.now()
-            days_since = (now - df["Дата публикации"]).dt.days
-            return df[days_since <= max_days]
-    except Exception as e:
-        logger.error(f"Ошибка при фильтрации по дате: {e}")
-        return df
+    return filter_videos_df(df, max_days=max_days)
 
-# Функция для фильтрации видео по просмотрам
 def filter_by_views(df: pd.DataFrame, min_views: int) -> pd.DataFrame:
     """
     Фильтрует DataFrame по количеству просмотров.
@@ -142,29 +182,7 @@ def filter_by_views(df: pd.DataFrame, min_views: int) -> pd.DataFrame:
     Returns:
         pd.DataFrame: Отфильтрованный DataFrame.
     """
-    if min_views <= 0 or "Количество просмотров" not in df.columns:
-        return df
-    
-    try:
-        # Убедимся, что колонка с просмотрами содержит числа
-        views_col = df["Количество просмотров"].copy()
-        
-        # Если значения уже числовые
-        if pd.api.types.is_numeric_dtype(views_col):
-            return df[views_col >= min_views]
-        
-        # Если значения строковые, пробуем преобразовать
-        # Удаляем нечисловые символы и преобразуем в числа
-        df_with_numeric_views = df.copy()
-        df_with_numeric_views["numeric_views"] = views_col.astype(str).str.replace(r'[^\d]', '', regex=True).astype(float)
-        
-        # Фильтруем по преобразованным значениям
-        mask = df_with_numeric_views["numeric_views"] >= min_views
-        return df_with_numeric_views[mask].drop(columns=["numeric_views"])
-        
-    except Exception as e:
-        logger.error(f"Ошибка при фильтрации по просмотрам: {e}")
-        return df
+    return filter_videos_df(df, min_views=min_views)
 
 def filter_by_search(df: pd.DataFrame, search_query: str) -> pd.DataFrame:
     """
@@ -177,20 +195,7 @@ def filter_by_search(df: pd.DataFrame, search_query: str) -> pd.DataFrame:
     Returns:
         pd.DataFrame: Отфильтрованный DataFrame.
     """
-    if not search_query or search_query.strip() == "":
-        return df
-    
-    # Преобразуем запрос к нижнему регистру для регистронезависимого поиска
-    search_query = search_query.lower()
-    
-    # Ищем в заголовке видео
-    if "Заголовок видео" in df.columns:
-        # Создаем маску для фильтрации, игнорируя регистр
-        mask = df["Заголовок видео"].str.lower().str.contains(search_query, na=False)
-        return df[mask]
-    else:
-        # Если нет колонки с заголовком, возвращаем исходный DataFrame
-        return df
+    return filter_videos_df(df, search_query=search_query)
 
 def clean_youtube_url(url: str) -> str:
     """
@@ -205,6 +210,10 @@ def clean_youtube_url(url: str) -> str:
     if not url or not isinstance(url, str):
         return url
     
+    # Быстрый путь для уже очищенных ссылок (большинство URL рекомендаций)
+    if is_clean_watch_url(url):
+        return url
+    
     # Проверяем, что это YouTube URL
     if "youtube.com/watch" not in url and "youtu.be/" not in url:
         return url
@@ -297,37 +306,12 @@ def test_recommendations(source_links: List[str],
         "count_get_video_data": 0
     }
     
-    # Таймеры для детального отслеживания
-    timers = {
-        "current_operation_start": 0,
-        "recommendation_times": [],
-        "video_data_times": []
-    }
+    # Единый момент отсчета для дат публикации и фильтра по дате на весь запуск:
+    # время не запрашивается для каждого видео, а граница суток не сдвигается посреди обработки
+    now = datetime.now()
     
-    # Функция для обновления таймеров
-    def start_timer(operation_name):
-        timers["current_operation"] = operation_name
-        timers["current_operation_start"] = time.time()
-        logger.info(f"Начало операции: {operation_name}")
-        
-    def end_timer(operation_name):
-        if timers["current_operation_start"] == 0:
-            return 0
-            
-        elapsed_time = time.time() - timers["current_operation_start"]
-        logger.info(f"Завершение операции: {operation_name}, время: {elapsed_time:.2f}с")
-        
-        # Сохраняем время в зависимости от типа операции
-        if "получение рекомендаций" in operation_name.lower():
-            timers["recommendation_times"].append(elapsed_time)
-            stats["time_get_recommendations"] += elapsed_time
-            stats["count_get_recommendations"] += 1
-        elif "получение данных" in operation_name.lower():
-            timers["video_data_times"].append(elapsed_time)
-            stats["time_get_video_data"] += elapsed_time
-            stats["count_get_video_data"] += 1
-            
-        return elapsed_time
+    # Промежуточный статус и полоса прогресса обновляются с ограничением частоты
+    show_status, show_progress = throttled_status_updaters(status_text, progress_bar)
     
     # Функция для вывода статистики о времени выполнения
     def update_timing_stats():
@@ -355,7 +339,7 @@ def test_recommendations(source_links: List[str],
             return pd.DataFrame()
         
         # Фильтруем только валидные ссылки YouTube
-        valid_links = [link.strip() for link in source_links if "youtube.com" in link or "youtu.be" in link]
+        valid_links = [link.strip() for link in filter(_YT_RE.search, source_links)]
         
         if not valid_links:
             status_text.warning("Не найдено валидных ссылок YouTube. Пожалуйста, проверьте список ссылок.")
@@ -447,17 +431,17 @@ def test_recommendations(source_links: List[str],
                     
             if views_count < min_video_views:
                 stats["skipped_views"] += 1
-                logger.info(f"Видео не соответствует критерию просмотров: {video_data.get('url')} (просмотров: {views_count}, минимум: {min_video_views})")
+                logger.debug(f"Видео не соответствует критерию просмотров: {video_data.get('url')} (просмотров: {views_count}, минимум: {min_video_views})")
                 return False
                 
             # Проверяем дату публикации
             pub_date = video_data.get("publication_date")
             if pub_date:
                 try:
-                    days_since_publication = (datetime.now() - pub_date).days
+                    days_since_publication = (now - pub_date).days
                     if days_since_publication > max_days_since_publication:
                         stats["skipped_date"] += 1
-                        logger.info(f"Видео не соответствует критерию даты: {video_data.get('url')} (дней с публикации: {days_since_publication}, максимум: {max_days_since_publication})")
+                        logger.debug(f"Видео не соответствует критерию даты: {video_data.get('url')} (дней с публикации: {days_since_publication}, максимум: {max_days_since_publication})")
                         return False
                 except Exception as e:
                     # Если возникла ошибка при расчете дней, лучше не фильтровать по этому критерию
@@ -466,14 +450,14 @@ def test_recommendations(source_links: List[str],
                 logger.warning(f"Отсутствует дата публикации для {video_data.get('url')}")
                 
             # Видео прошло все проверки
-            logger.info(f"Видео удовлетворяет критериям: {video_data.get('url')} (просмотров: {views_count}, соответствует параметрам)")
+            logger.debug(f"Видео удовлетворяет критериям: {video_data.get('url')} (просмотров: {views_count}, соответствует параметрам)")
             return True 
 
         for i, link in enumerate(valid_links):
             # Обновляем прогресс
             progress_value = float(i) / len(valid_links)
-            progress_bar.progress(progress_value)
-            status_text.text(f"Обрабатываем ссылку {i+1}/{len(valid_links)}: {link}")
+            show_progress(progress_value)
+            show_status(f"Обрабатываем ссылку {i+1}/{len(valid_links)}: {link}")
             stats["processed_links"] += 1
             
             # Проверяем тип ссылки (канал или видео)
@@ -486,11 +470,11 @@ def test_recommendations(source_links: List[str],
             
             if is_channel:
                 # Для канала получаем последние видео (используем channel_videos_limit)
-                status_text.text(f"Получение последних видео с канала: {url}")
-                start_timer(f"Получение видео с канала: {url}")
+                show_status(f"Получение последних видео с канала: {url}")
+                t0 = time.perf_counter()
                 channel_videos = youtube_analyzer.get_last_videos_from_channel(url, limit=channel_videos_limit)
-                channel_time = end_timer(f"Получение видео с канала: {url}")
-                status_text.text(f"Получено видео с канала за {channel_time:.2f}с")
+                channel_time = time.perf_counter() - t0
+                show_status(f"Получено видео с канала за {channel_time:.2f}с")
                 
                 if not channel_videos:
                     status_text.warning(f"Не удалось получить видео с канала {url}")
@@ -503,11 +487,11 @@ def test_recommendations(source_links: List[str],
                         continue
                     
                     stats["processed_videos"] += 1
-                    logger.info(f"Обработка видео {video_index+1}/{len(channel_videos)} с канала: {video_url}")
+                    logger.debug(f"Обработка видео {video_index+1}/{len(channel_videos)} с канала: {video_url}")
                     
                     # Получаем детали видео
-                    status_text.text(f"Получение деталей видео: {video_url}")
-                    start_timer(f"Получение данных о видео: {video_url}")
+                    show_status(f"Получение деталей видео: {video_url}")
+                    t0 = time.perf_counter()
                     
                     # Используем быстрый метод вместо get_video_details
                     video_data_df = youtube_analyzer.test_video_parameters_fast([video_url])
@@ -518,22 +502,26 @@ def test_recommendations(source_links: List[str],
                             "url": clean_youtube_url(video_url),
                             "title": video_data_df.iloc[0]["Заголовок"],
                             "views": video_data_df.iloc[0]["Просмотры_число"] if "Просмотры_число" in video_data_df.columns else int(video_data_df.iloc[0]["Просмотры"].replace(" ", "")),
-                            "publication_date": datetime.now() - timedelta(days=int(video_data_df.iloc[0]["Дней с публикации"])) if video_data_df.iloc[0]["Дней с публикации"] != "—" else datetime.now(),
+                            "publication_date": now - timedelta(days=int(video_data_df.iloc[0]["Дней с публикации"])) if video_data_df.iloc[0]["Дней с публикации"] != "—" else now,
                             "channel_name": "YouTube",  # Имя канала не доступно через быстрый метод
                             "channel_url": video_data_df.iloc[0]["Канал URL"] if "Канал URL" in video_data_df.columns else None
                         }
                     
-                    video_data_time = end_timer(f"Получение данных о видео: {video_url}")
-                    status_text.text(f"Получены данные о видео за {video_data_time:.2f}с")
+                    video_data_time = time.perf_counter() - t0
+                    stats["time_get_video_data"] += video_data_time
+                    stats["count_get_video_data"] += 1
+                    show_status(f"Получены данные о видео за {video_data_time:.2f}с")
                     
                     # Получаем рекомендации для этого видео независимо от критериев
-                    status_text.text(f"Получение рекомендаций для видео: {video_url}")
-                    start_timer(f"Получение рекомендаций для видео: {video_url}")
+                    show_status(f"Получение рекомендаций для видео: {video_url}")
+                    t0 = time.perf_counter()
                     # Используем быстрый метод вместо обычного
                     recommendations = youtube_analyzer.get_recommended_videos_fast(video_url, limit=recommendations_per_video)
-                    rec_time = end_timer(f"Получение рекомендаций для видео: {video_url}")
-                    status_text.text(f"Получены рекомендации ({len(recommendations)}) за {rec_time:.2f}с")
-                    logger.info(f"Получено {len(recommendations)} рекомендаций для видео {video_url}")
+                    rec_time = time.perf_counter() - t0
+                    stats["time_get_recommendations"] += rec_time
+                    stats["count_get_recommendations"] += 1
+                    show_status(f"Получены рекомендации ({len(recommendations)}) за {rec_time:.2f}с")
+                    logger.debug(f"Получено {len(recommendations)} рекомендаций для видео {video_url}")
                     
                     # Сохраняем URL рекомендаций для последующей обработки
                     recommendation_urls = []
@@ -549,7 +537,7 @@ def test_recommendations(source_links: List[str],
                     
                     # Добавляем все рекомендации для этого видео в общий список
                     all_recommendations.extend(recommendation_urls)
-                    logger.info(f"Добавлено {len(recommendation_urls)} рекомендаций для видео {video_url}")
+                    logger.debug(f"Добавлено {len(recommendation_urls)} рекомендаций для видео {video_url}")
                     
                     # Проверяем, соответствует ли видео с исходного канала заданным параметрам 
                     # для добавления в таблицу источников
@@ -560,7 +548,7 @@ def test_recommendations(source_links: List[str],
                     else:
                         # Если видео не соответствует критериям, пропускаем его добавление в итоговую таблицу
                         if video_data:
-                            status_text.text(f"Видео не соответствует критериям, не добавлено в таблицу: {video_url}")
+                            show_status(f"Видео не соответствует критериям, не добавлено в таблицу: {video_url}")
                 
                 # Обновляем статистику принудительно после обработки всех видео с канала
                 current_source_videos = len(source_videos) - source_videos_before
@@ -568,8 +556,8 @@ def test_recommendations(source_links: List[str],
                 update_stats(force=True, current_link=url, source_videos_count=current_source_videos, recommendations_count=current_recommendations)
             else:
                 # Для прямой ссылки на видео
-                status_text.text(f"Получение деталей видео: {url}")
-                start_timer(f"Получение данных о видео: {url}")
+                show_status(f"Получение деталей видео: {url}")
+                t0 = time.perf_counter()
                 
                 # Используем быстрый метод вместо get_video_details
                 video_data_df = youtube_analyzer.test_video_parameters_fast([url])
@@ -580,23 +568,27 @@ def test_recommendations(source_links: List[str],
                         "url": clean_youtube_url(url),
                         "title": video_data_df.iloc[0]["Заголовок"],
                         "views": video_data_df.iloc[0]["Просмотры_число"] if "Просмотры_число" in video_data_df.columns else int(video_data_df.iloc[0]["Просмотры"].replace(" ", "")),
-                        "publication_date": datetime.now() - timedelta(days=int(video_data_df.iloc[0]["Дней с публикации"])) if video_data_df.iloc[0]["Дней с публикации"] != "—" else datetime.now(),
+                        "publication_date": now - timedelta(days=int(video_data_df.iloc[0]["Дней с публикации"])) if video_data_df.iloc[0]["Дней с публикации"] != "—" else now,
                         "channel_name": "YouTube",  # Имя канала не доступно через быстрый метод
                         "channel_url": video_data_df.iloc[0]["Канал URL"] if "Канал URL" in video_data_df.columns else None
                     }
                 
-                video_data_time = end_timer(f"Получение данных о видео: {url}")
-                status_text.text(f"Получены данные о видео за {video_data_time:.2f}с")
+                video_data_time = time.perf_counter() - t0
+                stats["time_get_video_data"] += video_data_time
+                stats["count_get_video_data"] += 1
+                show_status(f"Получены данные о видео за {video_data_time:.2f}с")
                 stats["processed_videos"] += 1
                 
                 # Получаем рекомендации для видео независимо от критериев
-                status_text.text(f"Получение рекомендаций для видео: {url}")
-                start_timer(f"Получение рекомендаций для видео: {url}")
+                show_status(f"Получение рекомендаций для видео: {url}")
+                t0 = time.perf_counter()
                 # Используем быстрый метод вместо обычного
                 recommendations = youtube_analyzer.get_recommended_videos_fast(url, limit=recommendations_per_video)
-                rec_time = end_timer(f"Получение рекомендаций для видео: {url}")
-                status_text.text(f"Получены рекомендации ({len(recommendations)}) за {rec_time:.2f}с")
-                logger.info(f"Получено {len(recommendations)} рекомендаций для видео {url}")
+                rec_time = time.perf_counter() - t0
+                stats["time_get_recommendations"] += rec_time
+                stats["count_get_recommendations"] += 1
+                show_status(f"Получены рекомендации ({len(recommendations)}) за {rec_time:.2f}с")
+                logger.debug(f"Получено {len(recommendations)} рекомендаций для видео {url}")
                 
                 # Сохраняем URL рекомендаций для последующей обработки
                 recommendation_urls = []
@@ -612,7 +604,7 @@ def test_recommendations(source_links: List[str],
                 
                 # Добавляем все рекомендации для этого видео в общий список
                 all_recommendations.extend(recommendation_urls)
-                logger.info(f"Добавлено {len(recommendation_urls)} рекомендаций для видео {url}")
+                logger.debug(f"Добавлено {len(recommendation_urls)} рекомендаций для видео {url}")
                 
                 # Проверяем, соответствует ли видео заданным параметрам для добавления в таблицу
                 if video_data and quick_filter_video(video_data):
@@ -622,7 +614,7 @@ def test_recommendations(source_links: List[str],
                 else:
                     # Если видео не соответствует критериям, пропускаем его добавление в итоговую таблицу
                     if video_data:
-                        status_text.text(f"Видео не соответствует критериям, не добавлено в таблицу: {url}")
+                        show_status(f"Видео не соответствует критериям, не добавлено в таблицу: {url}")
                 
                 # Обновляем статистику по завершению обработки видео
                 current_source_videos = len(source_videos) - source_videos_before
@@ -659,17 +651,17 @@ def test_recommendations(source_links: List[str],
         batch_size = 5  # Обрабатываем по 5 рекомендаций за раз
         for i in range(0, len(filtered_recommendations), batch_size):
             batch = filtered_recommendations[i:i+batch_size]
-            status_text.text(f"Обработка пакета рекомендаций {i+1}-{min(i+batch_size, len(filtered_recommendations))} из {len(filtered_recommendations)}")
+            show_status(f"Обработка пакета рекомендаций {i+1}-{min(i+batch_size, len(filtered_recommendations))} из {len(filtered_recommendations)}")
             
             # Засекаем время для всего пакета
-            start_timer(f"Обработка пакета рекомендаций {i+1}-{min(i+batch_size, len(filtered_recommendations))}")
+            batch_start = time.perf_counter()
             
             for rec in batch:
                 rec_url = rec["url"]
                 processed_recommendations += 1
                 
                 # Получаем детали рекомендованного видео
-                start_timer(f"Получение данных о рекомендации: {rec_url}")
+                t0 = time.perf_counter()
                 
                 # Используем быстрый метод вместо get_video_details
                 rec_data_df = youtube_analyzer.test_video_parameters_fast([rec_url])
@@ -681,7 +673,7 @@ def test_recommendations(source_links: List[str],
                             "url": rec_url,  # URL уже очищен на предыдущем этапе
                             "title": rec_data_df.iloc[0]["Заголовок"],
                             "views": rec_data_df.iloc[0]["Просмотры_число"] if "Просмотры_число" in rec_data_df.columns else int(rec_data_df.iloc[0]["Просмотры"].replace(" ", "")),
-                            "publication_date": datetime.now() - timedelta(days=int(rec_data_df.iloc[0]["Дней с публикации"])) if rec_data_df.iloc[0]["Дней с публикации"] != "—" else datetime.now(),
+                            "publication_date": now - timedelta(days=int(rec_data_df.iloc[0]["Дней с публикации"])) if rec_data_df.iloc[0]["Дней с публикации"] != "—" else now,
                             "channel_name": "YouTube",  # Имя канала не доступно через быстрый метод
                             "channel_url": rec_data_df.iloc[0]["Канал URL"] if "Канал URL" in rec_data_df.columns else None
                         }
@@ -692,14 +684,15 @@ def test_recommendations(source_links: List[str],
                             "url": rec_url,
                             "title": "Не удалось получить заголовок",
                             "views": min_video_views,  # Гарантируем, что видео пройдет фильтрацию по просмотрам
-                            "publication_date": datetime.now(),  # Гарантируем, что видео пройдет фильтрацию по дате
+                            "publication_date": now,  # Гарантируем, что видео пройдет фильтрацию по дате
                             "channel_name": "YouTube",
                             "channel_url": None
                         }
                 else:
                     logger.warning(f"Не удалось получить данные для рекомендации {rec_url}")
                 
-                video_data_time = end_timer(f"Получение данных о рекомендации: {rec_url}")
+                stats["time_get_video_data"] += time.perf_counter() - t0
+                stats["count_get_video_data"] += 1
                 stats["processed_videos"] += 1
                 
                 # Применяем фильтры к рекомендованным видео
@@ -712,14 +705,14 @@ def test_recommendations(source_links: List[str],
                     results.append(rec_data)
                     stats["added_videos"] += 1
                     added_recommendations += 1
-                    logger.info(f"Рекомендация {rec_url} добавлена в результаты (всего: {added_recommendations})")
+                    logger.debug(f"Рекомендация {rec_url} добавлена в результаты (всего: {added_recommendations})")
                 else:
                     if rec_data:
-                        logger.info(f"Рекомендация {rec_url} не прошла фильтрацию")
+                        logger.debug(f"Рекомендация {rec_url} не прошла фильтрацию")
             
             # Фиксируем время всего пакета
-            batch_time = end_timer(f"Обработка пакета рекомендаций {i+1}-{min(i+batch_size, len(filtered_recommendations))}")
-            status_text.text(f"Пакет обработан за {batch_time:.2f}с")
+            batch_time = time.perf_counter() - batch_start
+            show_status(f"Пакет обработан за {batch_time:.2f}с")
         
         # Добавляем исходные видео к результатам
         # Важно: сначала добавляем исходные видео, чтобы они не были удалены как дубликаты
@@ -784,15 +777,11 @@ def test_recommendations(source_links: List[str],
             df = df.drop_duplicates(subset=["Ссылка на видео"])
             
             # Преобразуем ссылки в активные для отображения в Streamlit
-            df["Ссылка на видео"] = df["Ссылка на видео"].apply(
-                lambda x: f'<a href="{x}" target="_blank">{x}</a>' if isinstance(x, str) else x
-            )
+            df["Ссылка на видео"] = html_links(df["Ссылка на видео"])
             
             # Преобразуем ссылки на каналы в активные для отображения в Streamlit
             if "Канал" in df.columns:
-                df["Канал"] = df["Канал"].apply(
-                    lambda x: f'<a href="{x}" target="_blank">{x}</a>' if isinstance(x, str) and x else x
-                )
+                df["Канал"] = html_links(df["Канал"])
                 
                 # Сохраняем URL канала, если колонка существует
                 if "Канал" in df.columns and "channel_url" not in df.columns:
@@ -1547,9 +1536,9 @@ def main():
                         if not prewatch_links.strip():
                             prewatch_status.error("❌ Необходимо указать хотя бы одну ссылку на YouTube видео для просмотра")
                         else:
-                            # Получаем список ссылок
-                            video_links = [link.strip() for link in prewatch_links.split("\n") if link.strip()]
-                            valid_links = [link for link in video_links if "youtube.com" in link or "youtu.be" in link]
+                            # Получаем список ссылок (разбор кэшируется по тексту поля)
+                            valid_links = parse_links(prewatch_links, youtube_only=True)
+                            capped_links = valid_links[:total_videos]
                             
                             if not valid_links:
                                 prewatch_status.error("❌ Не найдено валидных ссылок YouTube. Пожалуйста, проверьте список ссылок.")
@@ -1558,7 +1547,7 @@ def main():
                                 
                                 try:
                                     # Создаем HTML файл для ручного просмотра
-                                    html_content = create_manual_viewing_html(valid_links[:total_videos], 
+                                    html_content = create_manual_viewing_html(capped_links, 
                                                                         min_watch_time, max_watch_time)
                                     
                                     # Кодируем содержимое в base64 для скачивания
@@ -1567,7 +1556,7 @@ def main():
                                     # Создаем ссылку для скачивания и выводим её
                                     download_html = f'<a href="data:text/html;base64,{b64}" download="youtube_videos_to_watch.html"><button style="background-color: #4CAF50; color: white; padding: 12px 20px; border: none; border-radius: 4px; cursor: pointer; font-size: 16px;">⬇️ Скачать HTML файл с видео</button></a>'
                                     
-                                    prewatch_status.success(f"✅ HTML файл для просмотра {len(valid_links[:total_videos])} видео готов!")
+                                    prewatch_status.success(f"✅ HTML файл для просмотра {len(capped_links)} видео готов!")
                                     st.markdown(download_html, unsafe_allow_html=True)
                                     
                                     # Инструкции по использованию
@@ -1590,9 +1579,9 @@ def main():
                         if not prewatch_links.strip():
                             prewatch_status.error("❌ Необходимо указать хотя бы одну ссылку на YouTube видео для просмотра")
                         else:
-                            # Получаем список ссылок
-                            video_links = [link.strip() for link in prewatch_links.split("\n") if link.strip()]
-                            valid_links = [link for link in video_links if "youtube.com" in link or "youtu.be" in link]
+                            # Получаем список ссылок (разбор кэшируется по тексту поля)
+                            valid_links = parse_links(prewatch_links, youtube_only=True)
+                            capped_links = valid_links[:total_videos]
                             
                             if not valid_links:
                                 prewatch_status.error("❌ Не найдено валидных ссылок YouTube. Пожалуйста, проверьте список ссылок.")
@@ -1603,18 +1592,18 @@ def main():
                                     
                                     if existing_analyzer and existing_analyzer.driver:
                                         # Используем существующий драйвер для просмотра
-                                        prewatch_status.info(f"⏳ Запуск автоматического просмотра {len(valid_links[:total_videos])} видео...")
+                                        prewatch_status.info(f"⏳ Запуск автоматического просмотра {len(capped_links)} видео...")
                                         
                                         # Не меняем режим headless, используем текущее значение
                                         
                                         existing_analyzer.prewatch_videos(
-                                            valid_links[:total_videos],
+                                            capped_links,
                                             min_watch_time=min_watch_time,
                                             max_watch_time=max_watch_time,
                                             like_probability=like_probability,
                                             watch_percentage=watch_percentage
                                         )
-                                        prewatch_status.success(f"✅ Автоматический просмотр завершен! Просмотрено {len(valid_links[:total_videos])} видео.")
+                                        prewatch_status.success(f"✅ Автоматический просмотр завершен! Просмотрено {len(capped_links)} видео.")
                                         prewatch_status.warning("⚠️ Если видео не появились в истории YouTube, используйте ручной метод просмотра.")
                                     else:
                                         prewatch_status.error("❌ Драйвер не инициализирован. Попробуйте авторизоваться заново.")
@@ -1641,13 +1630,12 @@ def main():
                 )
                 
                 if source_input:
-                    source_links = [line.strip() for line in source_input.split("\n") if line.strip()]
+                    source_links = parse_links(source_input)
             else:  # Загрузить из файла
                 source_file = st.file_uploader("Загрузите файл со ссылками (по одной на строку)", type=["txt"])
                 
                 if source_file:
-                    source_content = source_file.read().decode("utf-8")
-                    source_links = [line.strip() for line in source_content.split("\n") if line.strip()]
+                    source_links = read_uploaded_links(source_file)
             
             if source_links:
                 st.success(f"Загружено {len(source_links)} ссылок.")
@@ -7,6 +7,21 @@ logging.basicConfig(level=logging.INFO,
                     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+def _persist_google_session_enabled() -> bool:
+    """
+    Проверяет, разрешено ли в secrets.toml (PERSIST_GOOGLE_SESSION = true) хранить профиль
+    Chrome с cookies входа на сервере. По умолчанию выключено: cookies хранятся в
+    незашифрованном виде.
+    
+    Returns:
+        bool: True, если сохранение входа между сессиями включено.
+    """
+    try:
+        return bool(st.secrets.get("PERSIST_GOOGLE_SESSION", False))
+    except Exception as e:
+        logger.warning(f"Не удалось прочитать настройку PERSIST_GOOGLE_SESSION из секретов: {e}")
+        return False
+
 def render_auth_section():
     """
     Отображает раздел авторизации в Google.
@@ -76,7 +91,9 @@ def render_auth_section():
                         auth_analyzer = YouTubeAnalyzer(
                             headless=True,  # Используем невидимый режим (headless) для скрытия браузера
                             use_proxy=False,
-                            google_account=google_account
+                            google_account=google_account,
+                            # Cookies входа сохраняются для следующих сессий, только если это явно включено
+                            persist_profile=_persist_google_session_enabled()
                         )
                         
                         # Инициализируем драйвер
@@ -109,7 +126,8 @@ def render_auth_section():
         ⚠️ Обратите внимание:
         - При первом входе может потребоваться дополнительное подтверждение
         - Если включена двухфакторная аутентификация, вам потребуется ввести код подтверждения
-        - Данные аккаунта хранятся только в памяти сессии и не сохраняются
+        - Пароль хранится только в памяти сессии
+        - Если в secrets.toml включено PERSIST_GOOGLE_SESSION, cookies входа сохраняются на сервере в профиле браузера (каталог sessions) в незашифрованном виде - см. раздел «Примечания безопасности» в SETUP.md
         - Для сохранения учетных данных можно использовать файл .streamlit/secrets.toml
         """)
     
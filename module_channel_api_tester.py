@@ -1,18 +1,22 @@
 import streamlit as st
 import logging
+import time
 import pandas as pd
-import requests
-import base64
 from typing import List, Dict, Any, Optional
-from youtube_scraper import YouTubeAnalyzer
-from utils import parse_youtube_url
+from youtube_scraper import get_http_session, get_api_analyzer
+from utils import parse_youtube_url, dataframe_to_csv_bytes, paginate_dataframe
 
 # Настройка логирования
 logging.basicConfig(level=logging.INFO, 
                     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Минимальный интервал между обновлениями статуса в цикле сбора данных (секунды)
+_STATUS_UPDATE_INTERVAL = 0.25
+
 # Функция для загрузки API ключа из secrets.toml
+# (вызывается при каждом перезапуске скрипта, поэтому результат кэшируется)
+@st.cache_data(show_spinner=False, ttl=600)
 def load_api_key_from_secrets():
     """
     Загружает YouTube API ключ из файла secrets.toml
@@ -139,13 +143,14 @@ def render_api_tester_section():
         status_message.info(f"Подготовка к сбору данных о {len(channel_urls)} каналах...")
         progress_bar.progress(10)
         
-        # Создаем экземпляр анализатора YouTube только для работы с API
-        api_analyzer = YouTubeAnalyzer(headless=True, use_proxy=False)
+        # Анализатор YouTube только для работы с API (общий экземпляр без браузера)
+        api_analyzer = get_api_analyzer()
         
         # Запускаем сбор данных
         channels_data = []
         total_channels = len(channel_urls)
         quota_exceeded = False
+        last_status_update = 0.0
         
         for idx, url in enumerate(channel_urls):
             try:
@@ -153,10 +158,14 @@ def render_api_tester_section():
                 if quota_exceeded:
                     break
                 
-                # Обновляем прогресс
-                progress = int(10 + (idx / total_channels) * 80)
-                progress_bar.progress(progress)
-                status_message.info(f"Обработка канала {idx+1}/{total_channels}: {url}")
+                # Обновляем прогресс не чаще раза в _STATUS_UPDATE_INTERVAL секунд,
+                # чтобы не перерисовывать сообщение Streamlit на каждой итерации
+                now = time.monotonic()
+                if now - last_status_update >= _STATUS_UPDATE_INTERVAL:
+                    progress = int(10 + (idx / total_channels) * 80)
+                    progress_bar.progress(progress)
+                    status_message.info(f"Обработка канала {idx+1}/{total_channels}: {url}")
+                    last_status_update = now
                 
                 # Извлекаем ID канала из URL
                 channel_id = api_analyzer._extract_channel_id(url)
@@ -185,7 +194,7 @@ def render_api_tester_section():
                             }
                             
                             try:
-                                search_response = requests.get(search_url, params=search_params)
+                                search_response = get_http_session().get(search_url, params=search_params)
                                 
                                 # Проверяем, не превышена ли квота API
                                 if search_response.status_code == 403 and "quota" in search_response.text.lower():
@@ -256,7 +265,6 @@ def render_api_tester_section():
                 }
                 
                 channels_data.append(channel_data)
-                status_message.success(f"Успешно получены данные о канале: {channel_details.get('title', 'Неизвестно')}")
                 
             except Exception as e:
                 # Проверяем, не является ли ошибка связанной с квотой API
@@ -321,11 +329,14 @@ def render_api_tester_section():
                     lambda x: f"{int(x):,}".replace(",", " ") if isinstance(x, (int, float)) else x
                 )
         
-        # Отображаем таблицу с данными
-        st.dataframe(results_df)
+        # Отображаем таблицу с данными (по одной странице)
+        st.dataframe(paginate_dataframe(results_df, key="api_test_results_page"))
         
-        # Создаем ссылку для скачивания CSV
-        csv = results_df.to_csv(index=False, sep='\t')
-        b64 = base64.b64encode(csv.encode()).decode()
-        href = f'<a href="data:file/csv;base64,{b64}" download="youtube_channels_api_data.csv" target="_blank">📊 Скачать данные о каналах (CSV)</a>'
-        st.markdown(href, unsafe_allow_html=True) 
\ No newline at end of file
+        # Кнопка для скачивания CSV (байты передаются напрямую, без base64)
+        csv = dataframe_to_csv_bytes(results_df, sep='\t')
+        st.download_button(
+            label="📊 Скачать данные о каналах (CSV)",
+            data=csv,
+            file_name="youtube_channels_api_data.csv",
+            mime="text/csv",
+        ) 
\ No newline at end of file
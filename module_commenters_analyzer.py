@@ -4,16 +4,15 @@ import re
 import logging
 import time
 import json
-import traceback
+import concurrent.futures
 from typing import List, Dict, Any, Optional
 from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException, NoSuchElementException, StaleElementReferenceException
-import requests
 from bs4 import BeautifulSoup
-from youtube_scraper import YouTubeAnalyzer
+from youtube_scraper import YouTubeAnalyzer, get_http_session
 from collections import defaultdict
 
 # Настройка логирования
@@ -21,6 +20,9 @@ logging.basicConfig(level=logging.INFO,
                     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Количество потоков для параллельных запросов информации о каналах через API
+_CHANNEL_API_WORKERS = 8
+
 class CommentersAnalyzer:
     """
     Класс для анализа комментаторов на YouTube видео.
@@ -229,8 +231,7 @@ class CommentersAnalyzer:
             return comments
             
         except Exception as e:
-            logger.error(f"Ошибка при получении комментариев: {str(e)}")
-            logger.error(traceback.format_exc())
+            logger.exception(f"Ошибка при получении комментариев: {str(e)}")
             return []
     
     def _extract_comment_data(self, comment_element) -> Dict[str, Any]:
@@ -498,7 +499,8 @@ class CommentersAnalyzer:
                     has_videos = channel_data.get("has_videos", True)
                     video_count = channel_data.get("video_count", 0)
                     
-                    logger.info(f"Успешно получены данные канала через JavaScript: {json.dumps(channel_data, ensure_ascii=False)}")
+                    if logger.isEnabledFor(logging.INFO):
+                        logger.info(f"Успешно получены данные канала через JavaScript: {json.dumps(channel_data, ensure_ascii=False)}")
                 else:
                     logger.warning("JavaScript извлечение данных канала не вернуло корректных данных, используем запасной метод")
             except Exception as js_e:
@@ -566,12 +568,13 @@ class CommentersAnalyzer:
                 "video_count": video_count
             }
             
-            logger.info(f"Данные канала: {json.dumps(channel_info, ensure_ascii=False)}")
+            # Сериализуем словарь только если сообщение действительно попадет в лог
+            if logger.isEnabledFor(logging.INFO):
+                logger.info(f"Данные канала: {json.dumps(channel_info, ensure_ascii=False)}")
             return channel_info
                 
         except Exception as e:
-            logger.error(f"Ошибка при получении информации о канале {channel_url}: {str(e)}")
-            logger.error(traceback.format_exc())
+            logger.exception(f"Ошибка при получении информации о канале {channel_url}: {str(e)}")
             return {
                 "channel_url": channel_url,
                 "channel_name": "Канал YouTube",
@@ -612,7 +615,7 @@ class CommentersAnalyzer:
             }
             
             # Отправляем запрос на страницу канала
-            response = requests.get(channel_url, headers=headers)
+            response = get_http_session().get(channel_url, headers=headers)
             if response.status_code != 200:
                 logger.warning(f"Ошибка HTTP при запросе данных канала: {response.status_code}")
                 return {}
@@ -637,8 +640,7 @@ class CommentersAnalyzer:
             }
             
         except Exception as e:
-            logger.error(f"Ошибка при получении информации о канале через HTTP {channel_url}: {str(e)}")
-            logger.error(traceback.format_exc())
+            logger.exception(f"Ошибка при получении информации о канале через HTTP {channel_url}: {str(e)}")
             return {}
 
     def check_channel_relevance(self, channel_info: Dict[str, Any], min_videos: int = 1, keywords: List[str] = None) -> bool:
@@ -718,8 +720,7 @@ class CommentersAnalyzer:
                     time.sleep(0.2)
                 
             except Exception as e:
-                logger.error(f"Ошибка при анализе комментариев видео {video_url}: {str(e)}")
-                logger.error(traceback.format_exc())
+                logger.exception(f"Ошибка при анализе комментариев видео {video_url}: {str(e)}")
                 continue
         
         # Преобразуем словарь в DataFrame
@@ -786,7 +787,7 @@ class CommentersAnalyzer:
                     params["pageToken"] = next_page_token
                 
                 # Делаем запрос
-                response = requests.get(comments_url, params=params)
+                response = get_http_session().get(comments_url, params=params)
                 
                 # Проверяем успешность запроса
                 if response.status_code != 200:
@@ -844,8 +845,7 @@ class CommentersAnalyzer:
             return comments
             
         except Exception as e:
-            logger.error(f"Ошибка при получении комментариев через API: {str(e)}")
-            logger.error(traceback.format_exc())
+            logger.exception(f"Ошибка при получении комментариев через API: {str(e)}")
             return []
             
     def get_channel_info_api(self, channel_url: str, api_key: str = None) -> Dict[str, Any]:
@@ -898,7 +898,7 @@ class CommentersAnalyzer:
                 
                 logger.info(f"Поиск ID канала по имени: {username}")
                 
-                search_response = requests.get(search_url, params=search_params)
+                search_response = get_http_session().get(search_url, params=search_params)
                 
                 if search_response.status_code != 200:
                     logger.error(f"Ошибка API при поиске канала: {search_response.status_code}")
@@ -940,7 +940,7 @@ class CommentersAnalyzer:
             
             logger.info(f"Запрашиваем информацию о канале {channel_id} через API")
             
-            channel_response = requests.get(channel_url, params=channel_params)
+            channel_response = get_http_session().get(channel_url, params=channel_params)
             
             if channel_response.status_code != 200:
                 logger.error(f"Ошибка API при получении данных канала: {channel_response.status_code}")
@@ -988,12 +988,12 @@ class CommentersAnalyzer:
                 "video_count": video_count
             }
             
-            logger.info(f"Данные канала через API: {json.dumps(channel_info, ensure_ascii=False)}")
+            if logger.isEnabledFor(logging.INFO):
+                logger.info(f"Данные канала через API: {json.dumps(channel_info, ensure_ascii=False)}")
             return channel_info
                 
         except Exception as e:
-            logger.error(f"Ошибка при получении информации о канале через API {channel_url}: {str(e)}")
-            logger.error(traceback.format_exc())
+            logger.exception(f"Ошибка при получении информации о канале через API {channel_url}: {str(e)}")
             return {}
 
 
@@ -1184,7 +1184,8 @@ def render_commenters_analyzer_section():
                 # Обрабатываем комментарии
                 status_placeholder.info(f"Найдено {len(comments)} комментариев для видео {i+1}/{len(valid_urls)}. Анализируем каналы...")
                 
-                channels_processed = 0
+                # Собираем уникальные новые каналы комментаторов этого видео
+                new_channels = []
                 for comment in comments:
                     channel_url = comment.get("channel_url")
                     if not channel_url:
@@ -1197,40 +1198,54 @@ def render_commenters_analyzer_section():
                     video_count[channel_url].add(video_url)
                     
                     # Если канал уже обработан, пропускаем получение информации
-                    if channel_url in all_commenters:
+                    if channel_url in all_commenters or channel_url in new_channels:
                         continue
                     
-                    # Получаем информацию о канале - через API или через Selenium
-                    channel_start = time.time()
-                    channels_processed += 1
-                    
-                    if channels_processed % 5 == 0:
-                        status_placeholder.info(f"Обработано {channels_processed} каналов из видео {i+1}/{len(valid_urls)}...")
+                    new_channels.append(channel_url)
+                
+                channels_processed = len(new_channels)
+                channel_start = time.time()
+                channel_infos = {}
+                
+                if use_api_for_channels and not quota_exceeded and new_channels:
+                    # Запросы к API ограничены сетевой задержкой, поэтому выполняем их параллельно
+                    status_placeholder.info(f"Получаем информацию о {channels_processed} каналах через API для видео {i+1}/{len(valid_urls)}...")
+                    with concurrent.futures.ThreadPoolExecutor(max_workers=_CHANNEL_API_WORKERS) as executor:
+                        api_results = executor.map(
+                            lambda url: commenters_analyzer.get_channel_info_api(url, youtube_api_key),
+                            new_channels
+                        )
+                        channel_infos = dict(zip(new_channels, api_results))
                     
-                    channel_info = {}
-                    if use_api_for_channels and not quota_exceeded:
-                        channel_info = commenters_analyzer.get_channel_info_api(channel_url, youtube_api_key)
-                        # Проверяем, не исчерпана ли квота API
-                        if hasattr(auth_analyzer, 'last_api_error') and 'quotaExceeded' in str(auth_analyzer.last_api_error):
-                            quota_exceeded = True
-                            st.warning("⚠️ Квота API для сбора данных о каналах исчерпана. Переключаемся на браузерный метод.")
-                            channel_info = commenters_analyzer.get_channel_info(channel_url)
-                    else:
-                        channel_info = commenters_analyzer.get_channel_info(channel_url)
+                    # Проверяем, не исчерпана ли квота API
+                    if hasattr(auth_analyzer, 'last_api_error') and 'quotaExceeded' in str(auth_analyzer.last_api_error):
+                        quota_exceeded = True
+                        st.warning("⚠️ Квота API для сбора данных о каналах исчерпана. Переключаемся на браузерный метод.")
+                
+                # Каналы без данных из API (или при работе без API) обрабатываем через браузер последовательно
+                browser_channels = [url for url in new_channels if not channel_infos.get(url)]
+                if use_api_for_channels and not quota_exceeded:
+                    browser_channels = []
+                for browser_index, channel_url in enumerate(browser_channels, start=1):
+                    if browser_index % 5 == 0:
+                        status_placeholder.info(f"Обработано {browser_index} каналов из видео {i+1}/{len(valid_urls)}...")
                     
-                    channel_end = time.time()
-                    timing_stats["channel_info_time"] += (channel_end - channel_start)
-                    timing_stats["channel_count"] += 1
+                    channel_infos[channel_url] = commenters_analyzer.get_channel_info(channel_url)
                     
-                    # Проверяем соответствие критериям
+                    # Добавляем небольшую задержку между запросами для избежания блокировки
+                    time.sleep(0.2)
+                
+                timing_stats["channel_info_time"] += (time.time() - channel_start)
+                timing_stats["channel_count"] += channels_processed
+                
+                # Проверяем соответствие критериям
+                for channel_url in new_channels:
+                    channel_info = channel_infos.get(channel_url)
                     if channel_info and commenters_analyzer.check_channel_relevance(channel_info, min_videos, keywords):
                         all_commenters[channel_url] = channel_info
                         timing_stats["relevant_channels"] += 1
                         # Логируем найденный релевантный канал с полной информацией
                         logger.info(f"Найден релевантный канал: {channel_info.get('channel_name', 'Неизвестно')} ({channel_url}), подписчиков: {channel_info.get('subscribers', 0)}")
-                    
-                    # Добавляем небольшую задержку между запросами для избежания блокировки
-                    time.sleep(0.2)
                 
                 video_end_time = time.time()
                 timing_stats["video_total"] += (video_end_time - video_start_time)
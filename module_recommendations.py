@@ -2,28 +2,372 @@ import os
 import time
 import logging
 import tempfile
+import threading
+import weakref
 import concurrent.futures
 from typing import List, Dict, Any, Optional, Tuple
 from datetime import datetime, timedelta
+from collections import defaultdict
+import numpy as np
 import pandas as pd
 import streamlit as st
-import base64
 import random
 import json
 import hashlib
 import uuid
 from io import BytesIO
 import re
-import traceback
 
 from youtube_scraper import YouTubeAnalyzer
-from utils import parse_youtube_url
+from utils import (parse_youtube_url, classify_youtube_url, dataframe_to_csv_bytes, paginate_dataframe, html_links,
+                   parse_links, read_uploaded_links, throttled_status_updaters, is_clean_watch_url)
 
 # Настройка логирования
 logging.basicConfig(level=logging.INFO, 
                     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Регулярное выражение для извлечения URL из HTML-ссылок (компилируется один раз при загрузке модуля)
+_ANCHOR_HREF_RE = re.compile(r'<a[^>]*href="([^"]+)"[^>]*>[^<]*</a>')
+
+# Количество потоков для параллельного получения рекомендаций.
+# get_recommended_videos_fast работает через HTTP без драйвера Selenium, поэтому запросы
+# можно выполнять одновременно; получение видео с канала остается последовательным.
+_RECOMMENDATION_WORKERS = 8
+
+# Колонки итоговой таблицы рекомендаций и их отображаемые названия
+_RESULT_COLUMNS = {
+    "url": "Ссылка на видео",
+    "title": "Заголовок видео",
+    "publication_date": "Дата публикации",
+    "views": "Количество просмотров",
+    "source": "Источник видео",
+    "channel_url": "Канал"
+}
+
+# Извлечение ID видео из ссылок youtu.be/ID и youtube.com/watch?...v=ID (для очистки URL от параметров)
+_YT_VIDEO_ID_RE = re.compile(r"(?:youtu\.be/|youtube\.com/watch\?(?:[^#]*?&)?v=)([^?&#/]+)")
+_WATCH_URL_PREFIX = "https://www.youtube.com/watch?v="
+
+# Скрытые колонки с исходными URL для колонок, которые в таблице отображаются как HTML-ссылки.
+# Экспорт берет URL из них, не разбирая HTML регулярным выражением
+_RAW_URL_COLUMNS = {
+    "Ссылка на видео": "_raw_video_url",
+    "Канал": "_raw_channel_url"
+}
+
+# Ключ st.session_state, под которым хранится браузер, переиспользуемый между запусками
+# (см. _SessionBrowser)
+_ANALYZER_STATE_KEY = "recommendations_analyzer"
+
+# Выполняющиеся сборы рекомендаций по ключу входных параметров: повторный запуск с теми же
+# параметрами (двойное нажатие кнопки, второй пользователь) ждет уже идущий сбор
+_INFLIGHT: Dict[str, concurrent.futures.Future] = {}
+_INFLIGHT_LOCK = threading.Lock()
+
+# Каталог, в котором собранные таблицы рекомендаций сохраняются в формате Feather,
+# чтобы их можно было восстановить после перезапуска сервера без повторного сбора.
+# Файлы привязаны к аккаунту Google (в имени - хэш email) и видны только при входе
+# в тот же аккаунт; сборы без входа в аккаунт на диск не сохраняются. У каждого файла
+# есть JSON-описание со списком исходных ссылок
+_RESULTS_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "cache")
+
+# Сохраненные результаты хранятся не дольше _SAVED_RESULTS_MAX_AGE секунд
+# и не более _MAX_SAVED_RESULTS файлов на аккаунт (старые удаляются при сохранении новых)
+_SAVED_RESULTS_MAX_AGE = 7 * 24 * 3600
+_MAX_SAVED_RESULTS = 10
+
+def _results_owner(google_account: Optional[Dict[str, str]]) -> Optional[str]:
+    """
+    Возвращает ключ владельца сохраненных результатов - хэш email аккаунта Google.
+    
+    Args:
+        google_account (Dict[str, str], optional): Данные аккаунта Google.
+        
+    Returns:
+        Optional[str]: Ключ владельца для имени файла или None, если вход в аккаунт не выполнен.
+    """
+    email = (google_account or {}).get("email", "").strip().lower()
+    if not email:
+        return None
+    return hashlib.blake2b(email.encode(), digest_size=8).hexdigest()
+
+def _list_saved_results(owner: str) -> List[str]:
+    """
+    Возвращает сохраненные результаты владельца, новые первыми. Файлы старше
+    _SAVED_RESULTS_MAX_AGE не возвращаются (удаляются они при следующем сохранении).
+    
+    Args:
+        owner (str): Ключ владельца (см. _results_owner).
+        
+    Returns:
+        List[str]: Пути к файлам Feather.
+    """
+    if not os.path.isdir(_RESULTS_CACHE_DIR):
+        return []
+    
+    prefix = f"results_{owner}_"
+    oldest_allowed = time.time() - _SAVED_RESULTS_MAX_AGE
+    saved_files = [
+        (entry.stat().st_mtime, entry.path) for entry in os.scandir(_RESULTS_CACHE_DIR)
+        if entry.name.startswith(prefix) and entry.name.endswith(".feather")
+    ]
+    return [path for mtime, path in sorted(saved_files, reverse=True) if mtime >= oldest_allowed]
+
+def _prune_saved_results(owner: str) -> None:
+    """
+    Удаляет файлы владельца старше _SAVED_RESULTS_MAX_AGE и сверх лимита _MAX_SAVED_RESULTS.
+    
+    Args:
+        owner (str): Ключ владельца (см. _results_owner).
+    """
+    prefix = f"results_{owner}_"
+    kept = set(_list_saved_results(owner)[:_MAX_SAVED_RESULTS])
+    for entry in os.scandir(_RESULTS_CACHE_DIR):
+        if not entry.name.startswith(prefix) or entry.path in kept:
+            continue
+        if entry.name.endswith(".json") and entry.path[:-len(".json")] + ".feather" in kept:
+            continue
+        try:
+            os.remove(entry.path)
+        except OSError:
+            pass
+
+def _save_results(results_df: pd.DataFrame, source_links: List[str], google_account: Optional[Dict[str, str]] = None) -> None:
+    """
+    Сохраняет таблицу результатов на диск вместе с описанием (список исходных ссылок)
+    и удаляет устаревшие файлы того же аккаунта. Без входа в аккаунт ничего не сохраняется.
+    
+    Args:
+        results_df (pd.DataFrame): Таблица с результатами.
+        source_links (List[str]): Исходные ссылки, по которым собраны результаты.
+        google_account (Dict[str, str], optional): Аккаунт Google, от имени которого выполнялся сбор.
+    """
+    owner = _results_owner(google_account)
+    if owner is None:
+        return
+    
+    try:
+        os.makedirs(_RESULTS_CACHE_DIR, exist_ok=True)
+        digest = hashlib.blake2b("|".join(source_links).encode()).hexdigest()[:16]
+        base_path = os.path.join(_RESULTS_CACHE_DIR, f"results_{owner}_{digest}")
+        # Feather не хранит нестандартный индекс (нумерация с 1), он восстанавливается при загрузке
+        results_df.reset_index(drop=True).to_feather(f"{base_path}.feather")
+        with open(f"{base_path}.json", "w", encoding="utf-8") as meta_file:
+            json.dump({"source_links": source_links}, meta_file, ensure_ascii=False)
+        _prune_saved_results(owner)
+    except Exception as e:
+        logger.warning(f"Не удалось сохранить результаты на диск: {e}")
+
+def _saved_results_label(path: str) -> str:
+    """
+    Формирует подпись сохраненных результатов: время сбора и исходные ссылки.
+    
+    Args:
+        path (str): Путь к файлу Feather.
+        
+    Returns:
+        str: Подпись для списка выбора.
+    """
+    saved_at = datetime.fromtimestamp(os.path.getmtime(path)).strftime("%Y-%m-%d %H:%M")
+    try:
+        with open(path[:-len(".feather")] + ".json", encoding="utf-8") as meta_file:
+            source_links = json.load(meta_file).get("source_links", [])
+    except (OSError, ValueError):
+        return saved_at
+    links_str = ", ".join(source_links[:2])
+    if len(source_links) > 2:
+        links_str += f" и еще {len(source_links) - 2}"
+    return f"{saved_at} - {len(source_links)} ссылок: {links_str}"
+
+def _render_saved_results_loader() -> None:
+    """
+    Предлагает загрузить сохраненные ранее результаты текущего аккаунта,
+    если в текущей сессии их еще нет.
+    """
+    if "results_df" in st.session_state:
+        return
+    
+    google_account = st.session_state.get("google_account")
+    owner = _results_owner(google_account)
+    if owner is None:
+        return
+    saved_files = _list_saved_results(owner)
+    if not saved_files:
+        return
+    
+    with st.expander("Сохраненные результаты", expanded=False):
+        selected_file = st.selectbox(
+            f"Результаты предыдущих сборов ({google_account['email']}):",
+            options=saved_files,
+            format_func=_saved_results_label
+        )
+        if st.button("Загрузить сохраненные результаты"):
+            try:
+                results_df = pd.read_feather(selected_file)
+                results_df.index = range(1, len(results_df) + 1)
+                st.session_state["results_df"] = results_df
+                st.success(f"Загружено {len(results_df)} результатов.")
+            except Exception as e:
+                logger.warning(f"Не удалось загрузить сохраненные результаты {selected_file}: {e}")
+                st.error(f"Не удалось загрузить файл: {e}")
+
+class _RunStats:
+    """
+    Счетчики одного запуска test_recommendations. Атрибуты в __slots__ обновляются
+    быстрее, чем ключи словаря, а опечатка в имени счетчика сразу дает ошибку.
+    """
+    __slots__ = (
+        "processed_links",
+        "processed_videos",
+        "skipped_views",
+        "skipped_date",
+        "added_videos",
+        "total_time",
+        # Дополнительная статистика для замера времени операций
+        "time_get_recommendations",
+        "time_get_video_data",
+        "count_get_recommendations",
+        "count_get_video_data",
+    )
+    
+    def __init__(self):
+        for name in self.__slots__:
+            setattr(self, name, 0)
+
+class _SessionBrowser:
+    """
+    Браузер сессии Streamlit, переиспользуемый между запусками. Браузер закрывается
+    явно (_release_analyzer) или при завершении сессии: Streamlit удаляет ее состояние
+    вместе с этим объектом, и weakref.finalize закрывает драйвер.
+    """
+    __slots__ = ("analyzer", "close", "__weakref__")
+    
+    def __init__(self, analyzer: YouTubeAnalyzer):
+        self.analyzer = analyzer
+        # Колбэк ссылается только на анализатор, а не на сам объект, иначе объект не будет удален
+        self.close = weakref.finalize(self, analyzer.quit_driver)
+
+def _acquire_analyzer(google_account: Dict[str, str] = None) -> YouTubeAnalyzer:
+    """
+    Возвращает анализатор с запущенным браузером, сохраненный в сессии Streamlit,
+    или запускает новый. Запуск chromedriver занимает секунды, поэтому браузер
+    не закрывается после успешной обработки и используется при следующем нажатии кнопки;
+    при завершении сессии он закрывается (см. _SessionBrowser).
+    
+    Args:
+        google_account (Dict[str, str], optional): Данные аккаунта Google.
+        
+    Returns:
+        YouTubeAnalyzer: Анализатор YouTube (driver равен None, если браузер запустить не удалось).
+    """
+    browser = st.session_state.get(_ANALYZER_STATE_KEY)
+    if browser is not None:
+        analyzer = browser.analyzer
+        try:
+            # Проверяем, что браузер жив и запущен с тем же аккаунтом
+            if analyzer.driver and analyzer.google_account == google_account:
+                analyzer.driver.current_url
+                return analyzer
+        except Exception as e:
+            logger.warning(f"Сохраненный браузер недоступен, запускаем новый: {e}")
+        _release_analyzer(analyzer)
+    
+    analyzer = YouTubeAnalyzer(headless=True, use_proxy=False, google_account=google_account)
+    analyzer.setup_driver()
+    if analyzer.driver:
+        st.session_state[_ANALYZER_STATE_KEY] = _SessionBrowser(analyzer)
+    return analyzer
+
+def _release_analyzer(analyzer: YouTubeAnalyzer) -> None:
+    """
+    Закрывает браузер анализатора и удаляет его из сессии Streamlit.
+    
+    Args:
+        analyzer (YouTubeAnalyzer): Анализатор YouTube.
+    """
+    browser = st.session_state.get(_ANALYZER_STATE_KEY)
+    if browser is not None and browser.analyzer is analyzer:
+        del st.session_state[_ANALYZER_STATE_KEY]
+        # Финализатор срабатывает один раз: при удалении объекта драйвер повторно не закрывается
+        browser.close()
+    analyzer.quit_driver()
+
+def _fetch_recommendations(youtube_analyzer: YouTubeAnalyzer, video_url: str, limit: int) -> Tuple[List[Any], float]:
+    """
+    Получает рекомендации для видео (выполняется в пуле потоков).
+    
+    Args:
+        youtube_analyzer (YouTubeAnalyzer): Анализатор YouTube.
+        video_url (str): URL видео.
+        limit (int): Максимальное количество рекомендаций.
+        
+    Returns:
+        Tuple[List[Any], float]: Список рекомендаций и время выполнения запроса в секундах.
+    """
+    started = time.time()
+    try:
+        recommendations = youtube_analyzer.get_recommended_videos_fast(video_url, limit=limit)
+    except Exception as e:
+        logger.error(f"Ошибка при получении рекомендаций: {e}")
+        recommendations = []
+    return recommendations or [], time.time() - started
+
+def _df_to_video_data(df: pd.DataFrame, urls: List[str], now: Optional[pd.Timestamp] = None) -> List[Dict[str, Any]]:
+    """
+    Преобразует результат test_video_parameters_fast в список словарей видео.
+    Колонки обрабатываются целиком, даты публикации считаются от одного момента времени.
+    
+    Args:
+        df (pd.DataFrame): Таблица с параметрами видео (строки в порядке urls).
+        urls (List[str]): Очищенные URL видео.
+        now (pd.Timestamp, optional): Момент, от которого отсчитываются дни с публикации
+            (по умолчанию текущее время).
+        
+    Returns:
+        List[Dict[str, Any]]: Словари с данными о видео в порядке строк таблицы.
+    """
+    # Дни с публикации и даты считаются сразу для всех видео (без даты - 0 дней)
+    # Числовые колонки Просмотры_число и Дней_число test_video_parameters_fast формирует всегда
+    days_since_pub = df["Дней_число"].fillna(0).astype(int)
+    if now is None:
+        now = pd.Timestamp.now()
+    publication_dates = now - pd.to_timedelta(days_since_pub, unit="D")
+    
+    return [
+        {
+            "url": url,
+            "title": title,
+            "views": views_count,
+            "publication_date": publication_date,
+            "channel_name": "YouTube",  # Имя канала не доступно через быстрый метод
+            "channel_url": channel_url
+        }
+        for url, title, views_count, publication_date, channel_url
+        in zip(urls, df["Заголовок"], df["Просмотры_число"], publication_dates, df["Канал URL"])
+    ]
+
+def _fast_filter_mask(df: pd.DataFrame, max_days: int, min_views: int) -> Tuple[np.ndarray, int, int]:
+    """
+    Проверяет результат test_video_parameters_fast по просмотрам и дате публикации прямо по
+    числовым колонкам, до построения словарей видео. Условия совпадают с filter_videos:
+    видео без даты считается опубликованным сегодня, без просмотров - имеющим 0 просмотров.
+    
+    Args:
+        df (pd.DataFrame): Результат test_video_parameters_fast.
+        max_days (int): Максимальное количество дней с момента публикации.
+        min_views (int): Минимальное количество просмотров.
+        
+    Returns:
+        Tuple[np.ndarray, int, int]: Маска прошедших фильтр строк, число отсеянных по просмотрам
+        (среди прошедших проверку даты) и число отсеянных по дате.
+    """
+    days = df["Дней_число"].fillna(0).astype(int).to_numpy()
+    views = df["Просмотры_число"].fillna(0).to_numpy()
+    date_ok = days <= max_days
+    views_ok = views >= min_views
+    return date_ok & views_ok, int(np.count_nonzero(date_ok & ~views_ok)), int(np.count_nonzero(~date_ok))
+
 # Функция для фильтрации видео по дате
 def filter_by_date(df: pd.DataFrame, max_days: int) -> pd.DataFrame:
     """
@@ -39,26 +383,17 @@ def filter_by_date(df: pd.DataFrame, max_days: int) -> pd.DataFrame:
     if max_days <= 0 or "Дата публикации" not in df.columns:
         return df
     
-    # Преобразуем строки даты в datetime объекты и фильтруем
     try:
-        # Проверяем формат даты, если это строка
-        if pd.api.types.is_string_dtype(df["Дата публикации"]):
-            # Преобразуем в datetime
-            df_with_date = df.copy()
-            df_with_date["temp_date"] = pd.to_datetime(df["Дата публикации"], errors="coerce")
-            
-            # Расчитываем дни с публикации
-            now = datetime.now()
-            days_since = (now - df_with_date["temp_date"]).dt.days
-            
-            # Фильтруем
-            mask = days_since <= max_days
-            return df_with_date[mask].drop(columns=["temp_date"])
-        else:
-            # Если дата уже в формате datetime
-            now = datetime.now()
-            days_since = (now - df["Дата публикации"]).dt.days
-            return df[days_since <= max_days]
+        dates = df["Дата публикации"]
+        # test_recommendations сохраняет дату как datetime64, поэтому разбор строк
+        # нужен только для таблиц из других источников (cache=True разбирает повторы один раз)
+        if not pd.api.types.is_datetime64_any_dtype(dates):
+            dates = pd.to_datetime(dates, errors="coerce", cache=True)
+        
+        # Условие "прошло не больше max_days полных дней" сводится к сравнению с одной
+        # границей, без вычисления массива интервалов и временных колонок
+        cutoff_ts = pd.Timestamp.now() - pd.Timedelta(days=max_days + 1)
+        return df.loc[dates.gt(cutoff_ts)]
     except Exception as e:
         logger.error(f"Ошибка при фильтрации по дате: {e}")
         return df
@@ -79,26 +414,67 @@ def filter_by_views(df: pd.DataFrame, min_views: int) -> pd.DataFrame:
         return df
     
     try:
-        # Убедимся, что колонка с просмотрами содержит числа
-        views_col = df["Количество просмотров"].copy()
+        views_col = df["Количество просмотров"]
         
-        # Если значения уже числовые
-        if pd.api.types.is_numeric_dtype(views_col):
-            return df[views_col >= min_views]
-        
-        # Если значения строковые, пробуем преобразовать
-        # Удаляем нечисловые символы и преобразуем в числа
-        df_with_numeric_views = df.copy()
-        df_with_numeric_views["numeric_views"] = views_col.astype(str).str.replace(r'[^\d]', '', regex=True).astype(float)
+        # test_recommendations хранит просмотры как int64 - в этом случае сравниваем сразу
+        if not pd.api.types.is_numeric_dtype(views_col):
+            numeric_views = pd.to_numeric(views_col, errors="coerce")
+            # Регулярное выражение применяется только к нераспознанным значениям
+            # (строки с разделителями разрядов, например "1 234 567")
+            unparsed = numeric_views.isna() & views_col.notna()
+            if unparsed.any():
+                numeric_views[unparsed] = pd.to_numeric(
+                    views_col[unparsed].astype(str).str.replace(r'\D', '', regex=True), errors="coerce"
+                )
+            views_col = numeric_views
         
-        # Фильтруем по преобразованным значениям
-        mask = df_with_numeric_views["numeric_views"] >= min_views
-        return df_with_numeric_views[mask].drop(columns=["numeric_views"])
+        return df.loc[views_col.ge(min_views)]
         
     except Exception as e:
         logger.error(f"Ошибка при фильтрации по просмотрам: {e}")
         return df
 
+def filter_videos(videos: List[Dict[str, Any]], max_days: int, min_views: int,
+                  now: Optional[pd.Timestamp] = None) -> Tuple[List[Dict[str, Any]], int, int]:
+    """
+    Фильтрует список видео по просмотрам и дате публикации одним векторизованным проходом.
+    
+    Args:
+        videos (List[Dict[str, Any]]): Видео с ключами "views" и "publication_date".
+        max_days (int): Максимальное количество дней с момента публикации.
+        min_views (int): Минимальное количество просмотров.
+        now (pd.Timestamp, optional): Момент, от которого отсчитываются дни с публикации
+            (по умолчанию текущее время).
+        
+    Returns:
+        Tuple[List[Dict[str, Any]], int, int]: Прошедшие фильтр видео (в исходном порядке),
+        число отсеянных по просмотрам (среди прошедших проверку даты) и число отсеянных по дате.
+    """
+    if not videos:
+        return [], 0, 0
+    
+    # Маски считаются на массивах NumPy без построения промежуточного DataFrame.
+    # Сначала проверяется дата: при настройках по умолчанию (7 дней) этот фильтр отсеивает
+    # больше видео, чем порог просмотров, поэтому просмотры приводятся к числам только
+    # для видео, прошедших проверку даты.
+    # Видео без даты публикации по дате не отсеиваем (сравнение с NaN дает False)
+    publication_dates = pd.to_datetime([video.get("publication_date") for video in videos], errors="coerce")
+    if now is None:
+        now = pd.Timestamp.now()
+    days_since = (now - publication_dates).days.to_numpy(dtype=np.float64, na_value=np.nan)
+    date_ok_idx = np.flatnonzero(~(days_since > max_days))
+    
+    # Нечисловые и пустые значения просмотров считаем нулем
+    views = pd.to_numeric(np.array([videos[i].get("views") for i in date_ok_idx], dtype=object), errors="coerce")
+    views_ok = np.nan_to_num(views.astype(np.float64), nan=0.0) >= min_views
+    
+    skipped_date = len(videos) - len(date_ok_idx)
+    skipped_views = int(np.count_nonzero(~views_ok))
+    
+    passed = [videos[i] for i in date_ok_idx[views_ok]]
+    logger.info(f"Фильтрация видео: прошло {len(passed)} из {len(videos)} (по просмотрам отсеяно {skipped_views}, по дате {skipped_date})")
+    return passed, skipped_views, skipped_date
+
 def filter_by_search(df: pd.DataFrame, search_query: str) -> pd.DataFrame:
     """
     Фильтрует DataFrame по поисковому запросу в заголовке видео.
@@ -116,10 +492,19 @@ def filter_by_search(df: pd.DataFrame, search_query: str) -> pd.DataFrame:
     # Преобразуем запрос к нижнему регистру для регистронезависимого поиска
     search_query = search_query.lower()
     
+    # Заголовки в нижнем регистре вычисляются один раз при сборке таблицы (скрытая колонка
+    # _title_lower); для таблиц без нее приводим заголовки к нижнему регистру здесь
+    if "_title_lower" in df.columns:
+        titles_lower = df["_title_lower"]
+    elif "Заголовок видео" in df.columns:
+        titles_lower = df["Заголовок видео"].str.lower()
+    else:
+        titles_lower = None
+    
     # Ищем в заголовке видео
-    if "Заголовок видео" in df.columns:
-        # Создаем маску для фильтрации, игнорируя регистр
-        mask = df["Заголовок видео"].str.lower().str.contains(search_query, na=False)
+    if titles_lower is not None:
+        # Запрос ищется как обычная подстрока, без регулярных выражений
+        mask = titles_lower.str.contains(search_query, na=False, regex=False)
         return df[mask]
     else:
         # Если нет колонки с заголовком, возвращаем исходный DataFrame
@@ -138,52 +523,151 @@ def clean_youtube_url(url: str) -> str:
     if not url or not isinstance(url, str):
         return url
     
-    # Проверяем, что это YouTube URL
-    if "youtube.com/watch" not in url and "youtu.be/" not in url:
+    # Быстрый путь для уже очищенных ссылок (большинство URL рекомендаций)
+    if is_clean_watch_url(url):
         return url
     
+    # ID видео извлекается одним поиском скомпилированного выражения
+    match = _YT_VIDEO_ID_RE.search(url)
+    return f"{_WATCH_URL_PREFIX}{match.group(1)}" if match else url
+
+def clean_youtube_urls(urls: pd.Series) -> pd.Series:
+    """
+    Векторный вариант clean_youtube_url для колонки DataFrame: один проход Series.str.extract
+    вместо вызова функции для каждой строки.
+    
+    Args:
+        urls (pd.Series): Колонка с URL.
+        
+    Returns:
+        pd.Series: Очищенные URL (значения, не являющиеся ссылками на видео, остаются без изменений).
+    """
+    video_ids = urls.str.extract(_YT_VIDEO_ID_RE, expand=False)
+    return (_WATCH_URL_PREFIX + video_ids).fillna(urls)
+
+def _recommendation_urls(recommendations: List[Any]) -> List[str]:
+    """
+    Извлекает и очищает URL рекомендаций одного видео.
+    
+    Args:
+        recommendations (List[Any]): Рекомендации (словари с ключом "url" или строки URL).
+        
+    Returns:
+        List[str]: Очищенные URL рекомендаций (пустые значения пропускаются).
+    """
+    rec_urls = (rec.get("url") if isinstance(rec, dict) else rec for rec in recommendations)
+    return [clean_youtube_url(rec_url) for rec_url in rec_urls if rec_url]
+
+def run_recommendations_once(source_links: List[str],
+                             google_account: Dict[str, str] = None,
+                             channel_videos_limit: int = 5,
+                             recommendations_per_video: int = 5,
+                             max_days_since_publication: int = 7,
+                             min_video_views: int = 10000,
+                             existing_analyzer: YouTubeAnalyzer = None) -> pd.DataFrame:
+    """
+    Запускает test_recommendations, не допуская одновременного повторного сбора с теми же
+    параметрами: если такой сбор уже выполняется, возвращается его результат.
+    
+    Args:
+        source_links (List[str]): Список ссылок на видео/каналы YouTube.
+        google_account (Dict[str, str], optional): Данные аккаунта Google.
+        channel_videos_limit (int): Количество видео с канала.
+        recommendations_per_video (int): Количество рекомендаций для каждого видео.
+        max_days_since_publication (int): Максимальный возраст видео в днях.
+        min_video_views (int): Минимальное количество просмотров.
+        existing_analyzer (YouTubeAnalyzer, optional): Уже запущенный анализатор.
+        
+    Returns:
+        pd.DataFrame: Таблица с результатами.
+    """
+    # Рекомендации зависят от аккаунта, поэтому email входит в ключ
+    email = (google_account or {}).get("email", "")
+    params = (tuple(source_links), email, channel_videos_limit, recommendations_per_video,
+              max_days_since_publication, min_video_views)
+    key = hashlib.blake2b(repr(params).encode(), digest_size=16).hexdigest()
+    
+    with _INFLIGHT_LOCK:
+        future = _INFLIGHT.get(key)
+        is_owner = future is None
+        if is_owner:
+            future = concurrent.futures.Future()
+            _INFLIGHT[key] = future
+    
+    run_kwargs = dict(
+        google_account=google_account,
+        prewatch_settings=None,
+        channel_videos_limit=channel_videos_limit,
+        recommendations_per_video=recommendations_per_video,
+        max_days_since_publication=max_days_since_publication,
+        min_video_views=min_video_views,
+        existing_analyzer=existing_analyzer
+    )
+    
+    if not is_owner:
+        logger.info("Сбор рекомендаций с такими же параметрами уже выполняется, ожидаем его результат")
+        try:
+            return future.result().copy()
+        except concurrent.futures.CancelledError:
+            # Первый запуск был прерван (например, перезапуском скрипта) - собираем сами
+            return test_recommendations(source_links, **run_kwargs)
+    
     try:
-        # Обработка коротких ссылок youtu.be
-        if "youtu.be/" in url:
-            video_id = url.split("youtu.be/")[1].split("?")[0].split("#")[0]
-            return f"https://www.youtube.com/watch?v={video_id}"
-        
-        # Обработка стандартных ссылок youtube.com/watch?v=
-        if "youtube.com/watch" in url:
-            # Находим параметр v=
-            if "v=" in url:
-                video_id = url.split("v=")[1].split("&")[0].split("#")[0]
-                return f"https://www.youtube.com/watch?v={video_id}"
-            
-        # Если не удалось обработать, возвращаем исходный URL
-        return url
-    except Exception as e:
-        logger.warning(f"Ошибка при очистке YouTube URL: {e}")
-        return url
+        results_df = test_recommendations(source_links, **run_kwargs)
+        future.set_result(results_df)
+        return results_df
+    except BaseException:
+        # BaseException: перезапуск скрипта Streamlit прерывает выполнение исключением вне Exception
+        future.cancel()
+        raise
+    finally:
+        with _INFLIGHT_LOCK:
+            _INFLIGHT.pop(key, None)
 
 # Добавляем функцию для отображения результатов на вкладке
 def display_results_tab1():
     """
-    Функция для отображения таблицы с результатами и прямой ссылки на CSV на вкладке "Получение рекомендаций".
+    Функция для отображения таблицы с результатами и кнопки скачивания TSV на вкладке "Получение рекомендаций".
     """
     if "results_df" in st.session_state and not st.session_state["results_df"].empty:
-        # Нумерация с 1 и отображение индекса с поддержкой HTML
-        results_df_display = st.session_state["results_df"].copy()
-        st.write(results_df_display.to_html(escape=False), unsafe_allow_html=True)
+        results_df = st.session_state["results_df"]
         
-        # Сразу создаем ссылку для скачивания без кнопки
-        export_df = st.session_state["results_df"].copy()
-        if "Ссылка на видео" in export_df.columns:
-            export_df["Ссылка на видео"] = export_df["Ссылка на видео"].str.replace(r'<a href="(.+?)".*?>.*?</a>', r'\1', regex=True)
+        # Скрытые служебные колонки (с префиксом "_") не отображаются и не экспортируются
+        visible_columns = [col for col in results_df.columns if not col.startswith("_")]
         
-        # Очищаем колонку "Канал" от HTML-тегов для экспорта
-        if "Канал" in export_df.columns:
-            export_df["Канал"] = export_df["Канал"].str.replace(r'<a href="(.+?)".*?>.*?</a>', r'\1', regex=True)
+        # Нумерация с 1 и отображение индекса с поддержкой HTML (таблица только читается, копия не нужна).
+        # Выводится только текущая страница таблицы
+        page_df = paginate_dataframe(results_df, key="results_page")
+        st.write(page_df.to_html(columns=visible_columns, escape=False), unsafe_allow_html=True)
         
-        csv = export_df.to_csv(index=False, sep='\t')
-        b64 = base64.b64encode(csv.encode()).decode()
-        href = f'<div style="text-align: right; margin: 10px 0;"><a href="data:file/csv;base64,{b64}" download="youtube_results.tsv" style="background-color: #4CAF50; color: white; padding: 8px 16px; text-decoration: none; border-radius: 4px;">📊 Скачать TSV файл</a></div>'
-        st.markdown(href, unsafe_allow_html=True)
+        # Готовим данные для скачивания: колонки со ссылками берутся из скрытых колонок
+        # с исходными URL, остальные колонки передаются без изменений
+        export_columns = {}
+        html_columns = []
+        for col in visible_columns:
+            raw_col = _RAW_URL_COLUMNS.get(col)
+            if raw_col is None:
+                export_columns[col] = results_df[col]
+            elif raw_col in results_df.columns:
+                export_columns[col] = results_df[raw_col]
+            else:
+                export_columns[col] = results_df[col]
+                html_columns.append(col)
+        export_df = pd.DataFrame(export_columns)
+        
+        # Таблицы, сохраненные до появления скрытых колонок, очищаем от HTML-тегов как раньше,
+        # одним вызовом replace сразу для всех таких колонок
+        if html_columns:
+            export_df[html_columns] = export_df[html_columns].replace(_ANCHOR_HREF_RE, r'\1', regex=True)
+        
+        # Файл передается кнопке байтами, без base64-ссылки внутри HTML страницы
+        tsv = dataframe_to_csv_bytes(export_df, sep='\t')
+        st.download_button(
+            label="📊 Скачать TSV файл",
+            data=tsv,
+            file_name="youtube_results.tsv",
+            mime="text/tab-separated-values",
+        )
 
 def test_recommendations(source_links: List[str], 
                          google_account: Dict[str, str] = None, 
@@ -216,57 +700,20 @@ def test_recommendations(source_links: List[str],
     stats_container = st.container()
     
     # Статистика для отслеживания производительности
-    stats = {
-        "processed_links": 0,
-        "processed_videos": 0,
-        "skipped_views": 0,
-        "skipped_date": 0,
-        "added_videos": 0,
-        "total_time": 0,
-        # Дополнительная статистика для замера времени операций
-        "time_get_recommendations": 0,
-        "time_get_video_data": 0,
-        "count_get_recommendations": 0,
-        "count_get_video_data": 0
-    }
-    
-    # Таймеры для детального отслеживания
-    timers = {
-        "current_operation_start": 0,
-        "recommendation_times": [],
-        "video_data_times": []
-    }
-    
-    # Функция для обновления таймеров
-    def start_timer(operation_name):
-        timers["current_operation"] = operation_name
-        timers["current_operation_start"] = time.time()
-        logger.info(f"Начало операции: {operation_name}")
-        
-    def end_timer(operation_name):
-        if timers["current_operation_start"] == 0:
-            return 0
-            
-        elapsed_time = time.time() - timers["current_operation_start"]
-        logger.info(f"Завершение операции: {operation_name}, время: {elapsed_time:.2f}с")
-        
-        # Сохраняем время в зависимости от типа операции
-        if "получение рекомендаций" in operation_name.lower():
-            timers["recommendation_times"].append(elapsed_time)
-            stats["time_get_recommendations"] += elapsed_time
-            stats["count_get_recommendations"] += 1
-        elif "получение данных" in operation_name.lower():
-            timers["video_data_times"].append(elapsed_time)
-            stats["time_get_video_data"] += elapsed_time
-            stats["count_get_video_data"] += 1
-            
-        return elapsed_time
+    stats = _RunStats()
+    
+    # Единый момент отсчета для дат публикации и фильтра по дате на весь запуск:
+    # время не запрашивается для каждого пакета, а граница суток не сдвигается посреди обработки
+    reference_now = pd.Timestamp.now()
     
-    # Функция для вывода статистики о времени выполнения
-    def update_timing_stats():
-        pass
+    # Промежуточный статус и полоса прогресса обновляются с ограничением частоты
+    show_status, show_progress = throttled_status_updaters(status_text, progress_bar)
     
     start_time = time.time()
+    executor = None
+    browser_executor = None
+    # Браузер закрывается только после ошибки: после нее его состояние непредсказуемо
+    release_driver = False
     
     # Используем существующий анализатор, если он передан
     if existing_analyzer and existing_analyzer.driver:
@@ -274,12 +721,9 @@ def test_recommendations(source_links: List[str],
         status_text.text("Используем существующую сессию браузера...")
         logger.info("Используется существующий экземпляр анализатора YouTube")
     else:
-        # Создаем новый анализатор YouTube
-        status_text.text("Инициализация нового браузера...")
-        youtube_analyzer = YouTubeAnalyzer(headless=True, use_proxy=False, google_account=google_account)
-        
-        # Инициализируем драйвер
-        youtube_analyzer.setup_driver()
+        # Берем браузер, оставшийся с прошлого запуска, или запускаем новый
+        status_text.text("Инициализация браузера...")
+        youtube_analyzer = _acquire_analyzer(google_account)
 
     try:
         # Проверяем, инициализирован ли драйвер
@@ -288,7 +732,13 @@ def test_recommendations(source_links: List[str],
             return pd.DataFrame()
         
         # Фильтруем только валидные ссылки YouTube
-        valid_links = [link.strip() for link in source_links if "youtube.com" in link or "youtu.be" in link]
+        stripped_links = (link.strip() for link in source_links)
+        
+        # Приводим ссылки на видео к единому виду (youtu.be/ID -> youtube.com/watch?v=ID) и удаляем
+        # повторы с сохранением порядка, чтобы одно и то же видео или канал не обрабатывались дважды
+        valid_links = list(dict.fromkeys(
+            clean_youtube_url(link) for link in stripped_links if classify_youtube_url(link) != "invalid"
+        ))
         
         if not valid_links:
             status_text.warning("Не найдено валидных ссылок YouTube. Пожалуйста, проверьте список ссылок.")
@@ -301,9 +751,83 @@ def test_recommendations(source_links: List[str],
         
         status_text.text(f"Начинаем обработку {len(valid_links)} ссылок...")
         
-        # Список для хранения всех источников и рекомендаций до фильтрации
+        # Рекомендации запрашиваются в пуле потоков: для прямых ссылок на видео сразу,
+        # для видео с каналов - как только получен список видео канала
+        executor = concurrent.futures.ThreadPoolExecutor(max_workers=_RECOMMENDATION_WORKERS)
+        rec_futures = {}
+        
+        # Списки видео с каналов собираются браузером в отдельном потоке одна за другой
+        # (драйвер используется только этим потоком), пока основной поток ждет HTTP-запросы
+        # по предыдущим ссылкам
+        browser_executor = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+        channel_futures = {}
+        
+        def list_channel_videos(channel_url):
+            # Выполняется в потоке браузера: как только получен список видео канала, запрос
+            # их параметров ставится в пул потоков и идет, пока основной поток обрабатывает
+            # предыдущие ссылки. Элементы Streamlit из этого потока не обновляются
+            channel_videos = youtube_analyzer.get_last_videos_from_channel(channel_url, limit=channel_videos_limit)
+            channel_video_urls = [
+                video_info.get("url") if isinstance(video_info, dict) else video_info
+                for video_info in channel_videos or []
+            ]
+            channel_video_urls = [video_url for video_url in channel_video_urls if video_url]
+            
+            params_future = None
+            if channel_video_urls:
+                try:
+                    params_future = executor.submit(youtube_analyzer.test_video_parameters_fast, channel_video_urls)
+                except RuntimeError:
+                    # Пул уже остановлен (обработка завершилась с ошибкой) - параметры не нужны
+                    pass
+            return channel_videos, channel_video_urls, params_future
+        
+        direct_urls = []
+        for link in valid_links:
+            url, is_channel = parse_youtube_url(link)
+            if is_channel:
+                if url not in channel_futures:
+                    channel_futures[url] = browser_executor.submit(list_channel_videos, url)
+            elif url not in rec_futures:
+                direct_urls.append(url)
+                rec_futures[url] = executor.submit(_fetch_recommendations, youtube_analyzer, url, recommendations_per_video)
+        
+        # Параметры всех прямых ссылок на видео запрашиваются одним вызовом test_video_parameters_fast
+        # (страницы загружаются параллельно внутри него), а не отдельным запросом на каждую ссылку
+        direct_params_future = (
+            executor.submit(youtube_analyzer.test_video_parameters_fast, direct_urls) if direct_urls else None
+        )
+        direct_video_data = None
+        
+        def get_direct_video_data(video_url):
+            # Дожидаемся общего запроса параметров прямых ссылок и возвращаем данные одного видео
+            nonlocal direct_video_data
+            if direct_video_data is None:
+                direct_video_data = {}
+                try:
+                    video_data_df = direct_params_future.result()
+                    if not video_data_df.empty:
+                        # Преобразуем результат в формат словаря, совместимый с исходным
+                        direct_video_data = dict(zip(direct_urls, _df_to_video_data(video_data_df, direct_urls, reference_now)))
+                except Exception as e:
+                    logger.error(f"Ошибка при получении данных о видео: {e}")
+            return direct_video_data.get(video_url)
+        
+        def collect_recommendations(video_url):
+            # Дожидаемся результата из пула потоков и учитываем время запроса в статистике
+            if video_url not in rec_futures:
+                rec_futures[video_url] = executor.submit(_fetch_recommendations, youtube_analyzer, video_url, recommendations_per_video)
+            recommendations, elapsed_time = rec_futures[video_url].result()
+            stats.time_get_recommendations += elapsed_time
+            stats.count_get_recommendations += 1
+            return recommendations, elapsed_time
+        
+        # Список для хранения всех источников и рекомендаций до фильтрации.
+        # Рекомендации хранятся пакетами (список URL, URL исходного видео) - без словаря на
+        # каждую рекомендацию; общее количество ведется отдельным счетчиком
         all_video_sources = []
         all_recommendations = []
+        total_recommendations = 0
         
         # Функция для обновления статистики
         last_update_time = 0
@@ -320,19 +844,19 @@ def test_recommendations(source_links: List[str],
             # 1. Прошло не менее update_interval секунд с последнего обновления
             # 2. Или требуется принудительное обновление (force=True)
             # 3. Или есть существенные изменения в количестве обработанных/добавленных видео
-            substantial_change = (stats['processed_videos'] - last_processed_videos >= 5) or (stats['added_videos'] - last_added_videos >= 5)
+            substantial_change = (stats.processed_videos - last_processed_videos >= 5) or (stats.added_videos - last_added_videos >= 5)
             
             if not (force or substantial_change or (current_time - last_update_time >= update_interval)):
                 return
                 
             # Обновляем время последнего обновления и счетчики
             last_update_time = current_time
-            last_processed_videos = stats['processed_videos']
-            last_added_videos = stats['added_videos']
+            last_processed_videos = stats.processed_videos
+            last_added_videos = stats.added_videos
             
             # Вычисляем общее время выполнения
             time_elapsed = current_time - start_time
-            stats["total_time"] = time_elapsed
+            stats.total_time = time_elapsed
             
             # Обновляем отображение статистики
             with stats_container:
@@ -353,61 +877,24 @@ def test_recommendations(source_links: List[str],
                     st.markdown(f"При обработке строки {current_link} добавлено в результаты {link_stats[current_link]['source_videos']} видео с канала/источника и {link_stats[current_link]['recommendations']} видео с рекомендаций.")
                 else:
                     # Если ссылка не передана, но это принудительное обновление, показываем последнюю обработанную ссылку
-                    if force and stats['processed_links'] > 0 and stats['processed_links'] <= len(valid_links):
-                        last_link = valid_links[stats['processed_links']-1]
+                    if force and stats.processed_links > 0 and stats.processed_links <= len(valid_links):
+                        last_link = valid_links[stats.processed_links-1]
                         if last_link in link_stats:
                             st.markdown(f"При обработке строки {last_link} добавлено в результаты {link_stats[last_link]['source_videos']} видео с канала/источника и {link_stats[last_link]['recommendations']} видео с рекомендаций.")
-            
-            # Обновляем статистику о времени выполнения
-            update_timing_stats()
         
-        # Функция для быстрой предварительной фильтрации рекомендаций
-        def quick_filter_video(video_data):
-            if not video_data:
-                return False
-                
-            # Проверяем просмотры (быстрее получить)
-            views_count = video_data.get("views", 0)
-            # Защита от None значений
-            if views_count is None:
-                views_count = 0
-            # Убеждаемся, что views_count - число
-            if not isinstance(views_count, (int, float)):
-                try:
-                    views_count = int(views_count)
-                except (ValueError, TypeError):
-                    views_count = 0
-                    
-            if views_count < min_video_views:
-                stats["skipped_views"] += 1
-                logger.info(f"Видео не соответствует критерию просмотров: {video_data.get('url')} (просмотров: {views_count}, минимум: {min_video_views})")
-                return False
-                
-            # Проверяем дату публикации
-            pub_date = video_data.get("publication_date")
-            if pub_date:
-                try:
-                    days_since_publication = (datetime.now() - pub_date).days
-                    if days_since_publication > max_days_since_publication:
-                        stats["skipped_date"] += 1
-                        logger.info(f"Видео не соответствует критерию даты: {video_data.get('url')} (дней с публикации: {days_since_publication}, максимум: {max_days_since_publication})")
-                        return False
-                except Exception as e:
-                    # Если возникла ошибка при расчете дней, лучше не фильтровать по этому критерию
-                    logger.warning(f"Ошибка при проверке даты публикации для {video_data.get('url')}: {e}")
-            else:
-                logger.warning(f"Отсутствует дата публикации для {video_data.get('url')}")
-                
-            # Видео прошло все проверки
-            logger.info(f"Видео удовлетворяет критериям: {video_data.get('url')} (просмотров: {views_count}, соответствует параметрам)")
-            return True
+        # Фильтрация списка видео по просмотрам и дате одним векторизованным проходом
+        def apply_filters(videos):
+            passed, skipped_views, skipped_date = filter_videos(videos, max_days_since_publication, min_video_views, reference_now)
+            stats.skipped_views += skipped_views
+            stats.skipped_date += skipped_date
+            return passed
 
         for i, link in enumerate(valid_links):
             # Обновляем прогресс
             progress_value = float(i) / len(valid_links)
-            progress_bar.progress(progress_value)
+            show_progress(progress_value)
             status_text.text(f"Обрабатываем ссылку {i+1}/{len(valid_links)}: {link}")
-            stats["processed_links"] += 1
+            stats.processed_links += 1
             
             # Проверяем тип ссылки (канал или видео)
             url, is_channel = parse_youtube_url(link)
@@ -415,176 +902,119 @@ def test_recommendations(source_links: List[str],
             # Запоминаем текущее количество видео из источников перед обработкой нового канала/видео
             source_videos_before = len(source_videos)
             # Запоминаем текущее количество рекомендаций
-            recommendations_before = len(all_recommendations)
+            recommendations_before = total_recommendations
             
             if is_channel:
                 # Для канала получаем последние видео (используем channel_videos_limit)
-                status_text.text(f"Получение последних видео с канала: {url}")
-                start_timer(f"Получение видео с канала: {url}")
-                channel_videos = youtube_analyzer.get_last_videos_from_channel(url, limit=channel_videos_limit)
-                channel_time = end_timer(f"Получение видео с канала: {url}")
-                status_text.text(f"Получено видео с канала за {channel_time:.2f}с")
+                show_status(f"Получение последних видео с канала: {url}")
+                t0 = time.perf_counter()
+                channel_videos, channel_video_urls, params_future = channel_futures[url].result()
+                channel_time = time.perf_counter() - t0
+                show_status(f"Получено видео с канала за {channel_time:.2f}с")
                 
                 if not channel_videos:
                     status_text.warning(f"Не удалось получить видео с канала {url}")
                     continue
                 
-                # Обрабатываем каждое видео с канала
-                for video_index, video_info in enumerate(channel_videos):
-                    video_url = video_info.get("url") if isinstance(video_info, dict) else video_info
-                    if not video_url:
-                        continue
-                    
-                    stats["processed_videos"] += 1
-                    logger.info(f"Обработка видео {video_index+1}/{len(channel_videos)} с канала: {video_url}")
-                    
-                    # Получаем детали видео
-                    status_text.text(f"Получение деталей видео: {video_url}")
-                    start_timer(f"Получение данных о видео: {video_url}")
-                    
-                    try:
-                        # Используем быстрый метод вместо get_video_details
-                        video_data_df = youtube_analyzer.test_video_parameters_fast([video_url])
-                        
-                        video_data = None
-                        if not video_data_df.empty:
-                            # Преобразуем результат в формат словаря, совместимый с исходным
-                            video_data = {
-                                "url": clean_youtube_url(video_url),
-                                "title": video_data_df.iloc[0]["Заголовок"],
-                                "views": video_data_df.iloc[0]["Просмотры_число"] if "Просмотры_число" in video_data_df.columns else int(video_data_df.iloc[0]["Просмотры"].replace(" ", "")),
-                                "publication_date": datetime.now() - timedelta(days=int(video_data_df.iloc[0]["Дней с публикации"])) if video_data_df.iloc[0]["Дней с публикации"] != "—" else datetime.now(),
-                                "channel_name": "YouTube",  # Имя канала не доступно через быстрый метод
-                                "channel_url": video_data_df.iloc[0]["Канал URL"] if "Канал URL" in video_data_df.columns else None
-                            }
-                    except Exception as e:
-                        logger.error(f"Ошибка при получении данных о видео: {e}")
-                        video_data = None
+                # Сразу ставим в очередь запросы рекомендаций для всех видео канала
+                for video_url in channel_video_urls:
+                    if video_url not in rec_futures:
+                        rec_futures[video_url] = executor.submit(_fetch_recommendations, youtube_analyzer, video_url, recommendations_per_video)
+                
+                # Детали всех видео канала запрошены одним вызовом сразу после получения списка
+                show_status(f"Получение деталей {len(channel_video_urls)} видео с канала: {url}")
+                t0 = time.perf_counter()
+                channel_video_data = [None] * len(channel_video_urls)
+                
+                try:
+                    # Используем быстрый метод вместо get_video_details
+                    if params_future is not None:
+                        video_data_df = params_future.result()
+                    else:
+                        video_data_df = youtube_analyzer.test_video_parameters_fast(channel_video_urls)
                     
-                    video_data_time = end_timer(f"Получение данных о видео: {video_url}")
-                    status_text.text(f"Получены данные о видео за {video_data_time:.2f}с")
+                    if not video_data_df.empty:
+                        # Преобразуем результат в формат словарей, совместимый с исходным
+                        converted = _df_to_video_data(video_data_df, [clean_youtube_url(u) for u in channel_video_urls], reference_now)
+                        channel_video_data[:len(converted)] = converted
+                except Exception as e:
+                    logger.error(f"Ошибка при получении данных о видео с канала: {e}")
+                
+                video_data_time = time.perf_counter() - t0
+                stats.time_get_video_data += video_data_time
+                stats.count_get_video_data += 1
+                show_status(f"Получены данные о {len(channel_video_urls)} видео за {video_data_time:.2f}с")
+                
+                # Обрабатываем каждое видео с канала
+                stats.processed_videos += len(channel_video_urls)
+                for video_index, video_url in enumerate(channel_video_urls):
+                    logger.debug(f"Обработка видео {video_index+1}/{len(channel_video_urls)} с канала: {video_url}")
                     
                     # Получаем рекомендации для этого видео независимо от критериев
-                    status_text.text(f"Получение рекомендаций для видео: {video_url}")
-                    start_timer(f"Получение рекомендаций для видео: {video_url}")
-                    
-                    try:
-                        # Используем быстрый метод вместо обычного
-                        recommendations = youtube_analyzer.get_recommended_videos_fast(video_url, limit=recommendations_per_video)
-                    except Exception as e:
-                        logger.error(f"Ошибка при получении рекомендаций: {e}")
-                        recommendations = []
-                    
-                    rec_time = end_timer(f"Получение рекомендаций для видео: {video_url}")
-                    status_text.text(f"Получены рекомендации ({len(recommendations)}) за {rec_time:.2f}с")
-                    logger.info(f"Получено {len(recommendations)} рекомендаций для видео {video_url}")
+                    show_status(f"Получение рекомендаций для видео: {video_url}")
+                    recommendations, rec_time = collect_recommendations(video_url)
+                    show_status(f"Получены рекомендации ({len(recommendations)}) за {rec_time:.2f}с")
+                    logger.debug(f"Получено {len(recommendations)} рекомендаций для видео {video_url}")
                     
-                    # Сохраняем URL рекомендаций для последующей обработки
-                    recommendation_urls = []
-                    for rec_info in recommendations:
-                        rec_url = rec_info.get("url") if isinstance(rec_info, dict) else rec_info
-                        if rec_url:
-                            # Очищаем URL от параметров
-                            clean_rec_url = clean_youtube_url(rec_url)
-                            recommendation_urls.append({
-                                "url": clean_rec_url,
-                                "source_video": clean_youtube_url(video_url)
-                            })
-                    
-                    # Добавляем все рекомендации для этого видео в общий список
-                    all_recommendations.extend(recommendation_urls)
-                    logger.info(f"Добавлено {len(recommendation_urls)} рекомендаций для видео {video_url}")
-                    
-                    # Проверяем, соответствует ли видео с исходного канала заданным параметрам 
-                    # для добавления в таблицу источников
-                    if video_data and quick_filter_video(video_data):
-                        video_data["source"] = f"Канал: {link}"
-                        source_videos.append(video_data)
-                        stats["added_videos"] += 1
-                    else:
-                        # Если видео не соответствует критериям, пропускаем его добавление в итоговую таблицу
-                        if video_data:
-                            status_text.text(f"Видео не соответствует критериям, не добавлено в таблицу: {video_url}")
+                    # Сохраняем URL рекомендаций для последующей обработки одним пакетом
+                    # (URL исходного видео очищается один раз, а не для каждой рекомендации)
+                    recommendation_urls = _recommendation_urls(recommendations)
+                    all_recommendations.append((recommendation_urls, clean_youtube_url(video_url)))
+                    total_recommendations += len(recommendation_urls)
+                    logger.debug(f"Добавлено {len(recommendation_urls)} рекомендаций для видео {video_url}")
+                
+                # Проверяем видео с исходного канала на соответствие заданным параметрам
+                # одним проходом для всего канала и добавляем подходящие в таблицу источников
+                channel_passed = apply_filters([video_data for video_data in channel_video_data if video_data])
+                for video_data in channel_passed:
+                    video_data["source"] = f"Канал: {link}"
+                    source_videos.append(video_data)
+                stats.added_videos += len(channel_passed)
                 
                 # Обновляем статистику принудительно после обработки всех видео с канала
                 current_source_videos = len(source_videos) - source_videos_before
-                current_recommendations = len(all_recommendations) - recommendations_before
+                current_recommendations = total_recommendations - recommendations_before
                 update_stats(force=True, current_link=url, source_videos_count=current_source_videos, recommendations_count=current_recommendations)
             else:
-                # Для прямой ссылки на видео
-                status_text.text(f"Получение деталей видео: {url}")
-                start_timer(f"Получение данных о видео: {url}")
-                
-                # Получаем детали видео
-                status_text.text(f"Получение деталей видео: {url}")
-                start_timer(f"Получение данных о видео: {url}")
+                # Для прямой ссылки на видео получаем детали видео
+                show_status(f"Получение деталей видео: {url}")
+                t0 = time.perf_counter()
                 
-                try:
-                    # Используем быстрый метод вместо get_video_details
-                    video_data_df = youtube_analyzer.test_video_parameters_fast([url])
-                    
-                    video_data = None
-                    if not video_data_df.empty:
-                        # Преобразуем результат в формат словаря, совместимый с исходным
-                        video_data = {
-                            "url": clean_youtube_url(url),
-                            "title": video_data_df.iloc[0]["Заголовок"],
-                            "views": video_data_df.iloc[0]["Просмотры_число"] if "Просмотры_число" in video_data_df.columns else int(video_data_df.iloc[0]["Просмотры"].replace(" ", "")),
-                            "publication_date": datetime.now() - timedelta(days=int(video_data_df.iloc[0]["Дней с публикации"])) if video_data_df.iloc[0]["Дней с публикации"] != "—" else datetime.now(),
-                            "channel_name": "YouTube",  # Имя канала не доступно через быстрый метод
-                            "channel_url": video_data_df.iloc[0]["Канал URL"] if "Канал URL" in video_data_df.columns else None
-                        }
-                except Exception as e:
-                    logger.error(f"Ошибка при получении данных о видео: {e}")
-                    video_data = None
+                # Данные берутся из общего запроса по всем прямым ссылкам, запущенного в начале
+                video_data = get_direct_video_data(url)
                 
-                video_data_time = end_timer(f"Получение данных о видео: {url}")
-                status_text.text(f"Получены данные о видео за {video_data_time:.2f}с")
-                stats["processed_videos"] += 1
+                video_data_time = time.perf_counter() - t0
+                stats.time_get_video_data += video_data_time
+                stats.count_get_video_data += 1
+                show_status(f"Получены данные о видео за {video_data_time:.2f}с")
+                stats.processed_videos += 1
                 
                 # Получаем рекомендации для видео независимо от критериев
-                status_text.text(f"Получение рекомендаций для видео: {url}")
-                start_timer(f"Получение рекомендаций для видео: {url}")
-                
-                try:
-                    recommendations = youtube_analyzer.get_recommended_videos_fast(url, limit=recommendations_per_video)
-                except Exception as e:
-                    logger.error(f"Ошибка при получении рекомендаций: {e}")
-                    recommendations = []
-                
-                rec_time = end_timer(f"Получение рекомендаций для видео: {url}")
-                status_text.text(f"Получены рекомендации ({len(recommendations)}) за {rec_time:.2f}с")
-                logger.info(f"Получено {len(recommendations)} рекомендаций для видео {url}")
+                show_status(f"Получение рекомендаций для видео: {url}")
+                recommendations, rec_time = collect_recommendations(url)
+                show_status(f"Получены рекомендации ({len(recommendations)}) за {rec_time:.2f}с")
+                logger.debug(f"Получено {len(recommendations)} рекомендаций для видео {url}")
                 
-                # Сохраняем URL рекомендаций для последующей обработки
-                recommendation_urls = []
-                for rec_info in recommendations:
-                    rec_url = rec_info.get("url") if isinstance(rec_info, dict) else rec_info
-                    if rec_url:
-                        # Очищаем URL от параметров
-                        clean_rec_url = clean_youtube_url(rec_url)
-                        recommendation_urls.append({
-                            "url": clean_rec_url,
-                            "source_video": clean_youtube_url(url)
-                        })
-                
-                # Добавляем все рекомендации для этого видео в общий список
-                all_recommendations.extend(recommendation_urls)
-                logger.info(f"Добавлено {len(recommendation_urls)} рекомендаций для видео {url}")
+                # Сохраняем URL рекомендаций для последующей обработки одним пакетом
+                # (ссылки из valid_links уже очищены, повторная очистка не нужна)
+                recommendation_urls = _recommendation_urls(recommendations)
+                all_recommendations.append((recommendation_urls, url))
+                total_recommendations += len(recommendation_urls)
+                logger.debug(f"Добавлено {len(recommendation_urls)} рекомендаций для видео {url}")
                 
                 # Проверяем, соответствует ли видео заданным параметрам для добавления в таблицу
-                if video_data and quick_filter_video(video_data):
+                if video_data and apply_filters([video_data]):
                     video_data["source"] = f"Прямая ссылка: {link}"
                     source_videos.append(video_data)
-                    stats["added_videos"] += 1
+                    stats.added_videos += 1
                 else:
                     # Если видео не соответствует критериям, пропускаем его добавление в итоговую таблицу
                     if video_data:
-                        status_text.text(f"Видео не соответствует критериям, не добавлено в таблицу: {url}")
+                        show_status(f"Видео не соответствует критериям, не добавлено в таблицу: {url}")
                 
                 # Обновляем статистику по завершению обработки видео
                 current_source_videos = len(source_videos) - source_videos_before
-                current_recommendations = len(all_recommendations) - recommendations_before
+                current_recommendations = total_recommendations - recommendations_before
                 update_stats(force=True, current_link=url, source_videos_count=current_source_videos, recommendations_count=current_recommendations)
 
         # Добавляем исходные видео к результатам
@@ -592,96 +1022,113 @@ def test_recommendations(source_links: List[str],
         results = source_videos + results
         
         # Обработка собранных рекомендаций
-        status_text.text(f"Обработка {len(all_recommendations)} рекомендаций...")
-        logger.info(f"Начинаем обработку {len(all_recommendations)} собранных рекомендаций")
-        
-        # Удаляем дубликаты из списка рекомендаций
-        unique_recommendations = {}
-        for rec in all_recommendations:
-            rec_url = rec["url"]
-            # Если такой URL уже был, обновляем только источник
-            if rec_url in unique_recommendations:
-                unique_recommendations[rec_url]["sources"].append(rec["source_video"])
-            else:
-                unique_recommendations[rec_url] = {
-                    "url": rec_url,
-                    "sources": [rec["source_video"]]
-                }
+        status_text.text(f"Обработка {total_recommendations} рекомендаций...")
+        logger.info(f"Начинаем обработку {total_recommendations} собранных рекомендаций")
         
-        # Преобразуем словарь обратно в список
-        filtered_recommendations = list(unique_recommendations.values())
+        # Удаляем дубликаты из списка рекомендаций за один проход: для каждого URL собираем
+        # источники в словарь (упорядоченное множество), чтобы один и тот же источник
+        # не повторялся в подписи, а порядок источников сохранялся
+        recommendation_sources = defaultdict(dict)
+        for rec_urls, source_video in all_recommendations:
+            for rec_url in rec_urls:
+                recommendation_sources[rec_url][source_video] = None
+        
+        filtered_recommendations = [
+            {"url": rec_url, "sources": list(sources)}
+            for rec_url, sources in recommendation_sources.items()
+        ]
         status_text.text(f"Осталось {len(filtered_recommendations)} уникальных рекомендаций после удаления дубликатов")
         logger.info(f"После удаления дубликатов осталось {len(filtered_recommendations)} уникальных рекомендаций")
         
-        # Счетчики для отслеживания обработанных и добавленных рекомендаций
-        processed_recommendations = 0
+        # Счетчик добавленных рекомендаций
         added_recommendations = 0
+        # Подписи источников рекомендаций ("видео <ID>") по URL источника
+        source_labels = {}
         
         # Получаем информацию о рекомендациях пакетами для оптимизации
         batch_size = 5  # Обрабатываем по 5 рекомендаций за раз
+        
+        def submit_batch(start):
+            # Данные по всему пакету запрашиваются одним вызовом: строки возвращаются в порядке URL
+            if start >= len(filtered_recommendations):
+                return None
+            return executor.submit(
+                youtube_analyzer.test_video_parameters_fast,
+                [rec["url"] for rec in filtered_recommendations[start:start+batch_size]]
+            )
+        
+        next_batch_future = submit_batch(0)
         for i in range(0, len(filtered_recommendations), batch_size):
             batch = filtered_recommendations[i:i+batch_size]
-            status_text.text(f"Обработка пакета рекомендаций {i+1}-{min(i+batch_size, len(filtered_recommendations))} из {len(filtered_recommendations)}")
+            # Запрос следующего пакета ставится в пул сразу, чтобы его страницы загружались,
+            # пока ожидается и обрабатывается текущий пакет
+            batch_future, next_batch_future = next_batch_future, submit_batch(i + batch_size)
+            batch_label = f"{i+1}-{min(i+batch_size, len(filtered_recommendations))}"
+            show_status(f"Обработка пакета рекомендаций {batch_label} из {len(filtered_recommendations)}")
+            batch_start = time.perf_counter()
             
-            # Засекаем время для всего пакета
-            start_timer(f"Обработка пакета рекомендаций {i+1}-{min(i+batch_size, len(filtered_recommendations))}")
+            t0 = time.perf_counter()
+            batch_df = batch_future.result()
+            stats.time_get_video_data += time.perf_counter() - t0
+            stats.count_get_video_data += 1
             
-            for rec in batch:
+            # Рекомендации, не проходящие фильтры, отсеиваются по числовым колонкам результата,
+            # до построения словарей видео и подписей источников
+            batch_recs = batch
+            try:
+                if batch_df.empty:
+                    batch_video_data = []
+                else:
+                    keep, skipped_views, skipped_date = _fast_filter_mask(batch_df, max_days_since_publication, min_video_views)
+                    stats.skipped_views += skipped_views
+                    stats.skipped_date += skipped_date
+                    batch_recs = [rec for rec, passed in zip(batch, keep) if passed]
+                    # Преобразуем результат в формат словарей, совместимый с исходным (URL уже очищены)
+                    batch_video_data = _df_to_video_data(batch_df[keep], [rec["url"] for rec in batch_recs], reference_now)
+            except Exception as e:
+                logger.error(f"Ошибка при обработке данных пакета рекомендаций {batch_label}: {e}")
+                # Создаем минимальный набор данных, чтобы рекомендации не были потеряны
+                batch_video_data = [
+                    {
+                        "url": rec["url"],
+                        "title": "Не удалось получить заголовок",
+                        "views": min_video_views,  # Гарантируем, что видео пройдет фильтрацию по просмотрам
+                        "publication_date": reference_now,  # Гарантируем, что видео пройдет фильтрацию по дате
+                        "channel_name": "YouTube",
+                        "channel_url": None
+                    }
+                    for rec in batch_recs
+                ]
+            
+            # Счетчики статистики обновляются один раз на пакет, а не для каждого видео
+            stats.processed_videos += len(batch)
+            batch_passed = []
+            for rec_index, rec in enumerate(batch_recs):
                 rec_url = rec["url"]
-                processed_recommendations += 1
                 
-                # Получаем детали рекомендованного видео
-                start_timer(f"Получение данных о рекомендации: {rec_url}")
-                
-                # Используем быстрый метод вместо get_video_details
-                rec_data_df = youtube_analyzer.test_video_parameters_fast([rec_url])
-                rec_data = None
-                if not rec_data_df.empty:
-                    # Преобразуем результат в формат словаря, совместимый с исходным
-                    try:
-                        rec_data = {
-                            "url": rec_url,  # URL уже очищен на предыдущем этапе
-                            "title": rec_data_df.iloc[0]["Заголовок"],
-                            "views": rec_data_df.iloc[0]["Просмотры_число"] if "Просмотры_число" in rec_data_df.columns else int(rec_data_df.iloc[0]["Просмотры"].replace(" ", "")),
-                            "publication_date": datetime.now() - timedelta(days=int(rec_data_df.iloc[0]["Дней с публикации"])) if rec_data_df.iloc[0]["Дней с публикации"] != "—" else datetime.now(),
-                            "channel_name": "YouTube",  # Имя канала не доступно через быстрый метод
-                            "channel_url": rec_data_df.iloc[0]["Канал URL"] if "Канал URL" in rec_data_df.columns else None
-                        }
-                    except Exception as e:
-                        logger.error(f"Ошибка при обработке данных рекомендации {rec_url}: {e}")
-                        # Создаем минимальный набор данных, чтобы рекомендация не была потеряна
-                        rec_data = {
-                            "url": rec_url,
-                            "title": "Не удалось получить заголовок",
-                            "views": min_video_views,  # Гарантируем, что видео пройдет фильтрацию по просмотрам
-                            "publication_date": datetime.now(),  # Гарантируем, что видео пройдет фильтрацию по дате
-                            "channel_name": "YouTube",
-                            "channel_url": None
-                        }
-                else:
+                rec_data = batch_video_data[rec_index] if rec_index < len(batch_video_data) else None
+                if rec_data is None:
                     logger.warning(f"Не удалось получить данные для рекомендации {rec_url}")
                 
-                video_data_time = end_timer(f"Получение данных о рекомендации: {rec_url}")
-                stats["processed_videos"] += 1
-                
-                # Применяем фильтры к рекомендованным видео
-                if rec_data and quick_filter_video(rec_data):
-                    # Формируем список источников в удобном формате
-                    # Убедимся, что источники тоже очищены от параметров
-                    clean_sources = [clean_youtube_url(src) for src in rec["sources"]]
-                    source_str = ", ".join([f"видео {src.split('watch?v=')[-1]}" for src in clean_sources])
+                if rec_data:
+                    # Формируем список источников в удобном формате. Источники уже очищены
+                    # от параметров при сборе рекомендаций; подпись каждого источника
+                    # вычисляется один раз, так как одни и те же источники повторяются
+                    for src in rec["sources"]:
+                        if src not in source_labels:
+                            source_labels[src] = f"видео {src.rpartition('watch?v=')[2]}"
+                    source_str = ", ".join(source_labels[src] for src in rec["sources"])
                     rec_data["source"] = f"Рекомендация для: {source_str}"
-                    results.append(rec_data)
-                    stats["added_videos"] += 1
-                    added_recommendations += 1
-                    logger.info(f"Рекомендация {rec_url} добавлена в результаты (всего: {added_recommendations})")
-                else:
-                    if rec_data:
-                        logger.info(f"Рекомендация {rec_url} не прошла фильтрацию")
+                    batch_passed.append(rec_data)
+            
+            results.extend(batch_passed)
+            stats.added_videos += len(batch_passed)
+            added_recommendations += len(batch_passed)
+            logger.info(f"Из пакета {batch_label} в результаты добавлено {len(batch_passed)} рекомендаций (всего: {added_recommendations})")
             
             # Фиксируем время всего пакета
-            batch_time = end_timer(f"Обработка пакета рекомендаций {i+1}-{min(i+batch_size, len(filtered_recommendations))}")
-            status_text.text(f"Пакет обработан за {batch_time:.2f}с")
+            batch_time = time.perf_counter() - batch_start
+            show_status(f"Пакет обработан за {batch_time:.2f}с")
 
         # Завершаем прогресс
         progress_bar.progress(1.0)
@@ -689,78 +1136,64 @@ def test_recommendations(source_links: List[str],
 
         # Создаем датафрейм из результатов
         if results:
-            # Формируем датафрейм с нужными колонками
-            results_df = pd.DataFrame(results)
+            # Формируем датафрейм сразу с нужными колонками: порядок колонок задан заранее,
+            # поэтому pandas не собирает их из ключей всех словарей, а лишние ключи отбрасываются
+            results_df = pd.DataFrame.from_records(results, columns=list(_RESULT_COLUMNS))
+            results_df["views"] = pd.to_numeric(results_df["views"], errors="coerce").fillna(0).astype("int64")
+            results_df["publication_date"] = pd.to_datetime(results_df["publication_date"], errors="coerce")
             
             # Очищаем все URL-адреса в датафрейме от дополнительных параметров
-            if "url" in results_df.columns:
-                results_df["url"] = results_df["url"].apply(clean_youtube_url)
+            results_df["url"] = clean_youtube_urls(results_df["url"])
             
             # Удаляем дубликаты по URL видео, сохраняя порядок добавления
             # Это гарантирует, что исходные видео (которые были добавлены первыми) сохранятся
-            seen_urls = set()
-            unique_df_rows = []
-            
-            for idx, row in results_df.iterrows():
-                url = row["url"]
-                if url not in seen_urls:
-                    seen_urls.add(url)
-                    unique_df_rows.append(row)
-            
-            results_df = pd.DataFrame(unique_df_rows)
+            results_df = results_df.loc[~results_df["url"].duplicated(keep="first")]
             
             # Добавляем нумерацию, начинающуюся с 1 после удаления дубликатов
             results_df.index = range(1, len(results_df) + 1)
             
-            # Выбираем и переименовываем нужные колонки
-            columns_to_show = {
-                "url": "Ссылка на видео",
-                "title": "Заголовок видео",
-                "publication_date": "Дата публикации",
-                "views": "Количество просмотров",
-                "source": "Источник видео",
-                "channel_url": "Канал"
-            }
+            # Переименовываем колонки для отображения
+            results_df = results_df.rename(columns=_RESULT_COLUMNS)
             
-            # Фильтруем только существующие колонки
-            existing_columns = {k: v for k, v in columns_to_show.items() if k in results_df.columns}
+            # Исходные URL сохраняем в скрытых колонках до преобразования в HTML-ссылки (для экспорта)
+            for display_col, raw_col in _RAW_URL_COLUMNS.items():
+                results_df[raw_col] = results_df[display_col]
             
-            if existing_columns:
-                results_df = results_df[list(existing_columns.keys())]
-                results_df = results_df.rename(columns=existing_columns)
-                
-                # Удаляем дубликаты по URL видео
-                results_df = results_df.drop_duplicates(subset=["Ссылка на видео"])
-                
-                # Преобразуем ссылки в активные для отображения в Streamlit
-                results_df["Ссылка на видео"] = results_df["Ссылка на видео"].apply(
-                    lambda x: f'<a href="{x}" target="_blank">{x}</a>' if isinstance(x, str) else x
-                )
-                
-                # Преобразуем ссылки на каналы в активные для отображения в Streamlit
-                if "Канал" in results_df.columns:
-                    results_df["Канал"] = results_df["Канал"].apply(
-                        lambda x: f'<a href="{x}" target="_blank">{x}</a>' if isinstance(x, str) and x else x
-                    )
-                    
-                    # Сохраняем URL канала, если колонка существует
-                    if "Канал" in results_df.columns and "channel_url" not in results_df.columns:
-                        results_df["URL канала"] = results_df["Канал"]
-                
-                return results_df
-            else:
-                return pd.DataFrame()
+            # Заголовки в нижнем регистре для поиска (filter_by_search) вычисляем один раз
+            results_df["_title_lower"] = results_df["Заголовок видео"].str.lower()
+            
+            # Преобразуем ссылки в активные для отображения в Streamlit
+            results_df["Ссылка на видео"] = html_links(results_df["Ссылка на видео"])
+            
+            # Преобразуем ссылки на каналы в активные для отображения в Streamlit
+            # (набор колонок задан _RESULT_COLUMNS, поэтому колонка "Канал" есть всегда)
+            results_df["Канал"] = html_links(results_df["Канал"])
+            
+            # Сохраняем URL канала
+            results_df["URL канала"] = results_df["Канал"]
+            
+            return results_df
         else:
             return pd.DataFrame()
     except Exception as e:
         status_text.error(f"Произошла ошибка: {e}")
-        logger.error(f"Ошибка при тестировании рекомендаций: {e}")
-        traceback.print_exc()
+        logger.exception(f"Ошибка при тестировании рекомендаций: {e}")
+        release_driver = True
         return pd.DataFrame()
     finally:
-        # Закрываем драйвер только если он не был передан извне
+        # Останавливаем пул потоков: еще не начатые запросы отменяем, выполняющиеся не дожидаемся
+        if executor:
+            executor.shutdown(wait=False, cancel_futures=True)
+        
+        # Поток браузера дожидаемся: драйвер не должен использоваться после выхода из функции
+        if browser_executor:
+            browser_executor.shutdown(wait=True, cancel_futures=True)
+        
+        # Закрываем драйвер только если он не был передан извне и обработка завершилась ошибкой;
+        # после успешной обработки браузер остается в сессии до ее завершения
         if youtube_analyzer and youtube_analyzer is not existing_analyzer:
-            youtube_analyzer.quit_driver()
+            if release_driver or not youtube_analyzer.driver:
+                _release_analyzer(youtube_analyzer)
 
 def render_recommendations_section():
     """
@@ -768,6 +1201,9 @@ def render_recommendations_section():
     """
     st.header("Получение рекомендаций YouTube")
     
+    # Результаты прошлых сборов, сохраненные на диск (например, до перезапуска сервера)
+    _render_saved_results_loader()
+    
     # Стадия 2: Сбор рекомендаций
     st.header("Стадия 2: Сбор рекомендаций")
     
@@ -788,13 +1224,12 @@ def render_recommendations_section():
             )
             
             if source_input:
-                source_links = [line.strip() for line in source_input.split("\n") if line.strip()]
+                source_links = parse_links(source_input)
         else:  # Загрузить из файла
             source_file = st.file_uploader("Загрузите файл со ссылками (по одной на строку)", type=["txt"])
             
             if source_file:
-                source_content = source_file.read().decode("utf-8")
-                source_links = [line.strip() for line in source_content.split("\n") if line.strip()]
+                source_links = read_uploaded_links(source_file)
         
         if source_links:
             st.success(f"Загружено {len(source_links)} ссылок.")
@@ -854,10 +1289,10 @@ def render_recommendations_section():
                 google_account = st.session_state.get("google_account")
                 
                 # Вызываем функцию сбора рекомендаций с переданным драйвером
-                results_df = test_recommendations(
+                # (одинаковые одновременные запуски объединяются в один сбор)
+                results_df = run_recommendations_once(
                     source_links, 
                     google_account=google_account, 
-                    prewatch_settings=None,  # Убираем предварительный просмотр
                     channel_videos_limit=channel_videos_limit,
                     recommendations_per_video=recommendations_per_video,
                     max_days_since_publication=max_days_since_publication,
@@ -867,10 +1302,8 @@ def render_recommendations_section():
                 
                 if not results_df.empty:
                     st.session_state["results_df"] = results_df
+                    _save_results(results_df, source_links, google_account)
                     st.success(f"Собрано {len(results_df)} результатов.")
-                    
-                    # Отображаем результаты
-                    display_results_tab1()
                 else:
                     st.error("Не удалось собрать данные. Проверьте логи для подробностей.")
                     # Вывод диагностической информации
@@ -882,4 +1315,7 @@ def render_recommendations_section():
             # Проверяем наличие данных в сессии и отображаем их, если они есть
             if "results_df" in st.session_state and not st.session_state["results_df"].empty:
                 st.success(f"Показаны предыдущие результаты ({len(st.session_state['results_df'])} записей).")
-                display_results_tab1() 
\ No newline at end of file
+    
+    # Результаты отображаются один раз за прогон из session_state, в том числе
+    # после перезапуска скрипта Streamlit при любом взаимодействии с интерфейсом
+    display_results_tab1() 
\ No newline at end of file
@@ -1,18 +1,23 @@
 import streamlit as st
 import logging
+import re
 import pandas as pd
 import requests
-import base64
 from typing import List, Dict, Any, Optional
-from youtube_scraper import YouTubeAnalyzer
-from module_recommendations import clean_youtube_url
+from youtube_scraper import get_api_analyzer
+from utils import dataframe_to_csv_bytes, paginate_dataframe
 
 # Настройка логирования
 logging.basicConfig(level=logging.INFO, 
                     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Проверка ссылки на видео и извлечение ID одним проходом
+_VIDEO_ID_RE = re.compile(r"(?:youtube\.com/watch\?(?:[^#]*&)?v=|youtu\.be/)([A-Za-z0-9_-]+)")
+
 # Функция для загрузки API ключа из secrets.toml
+# (вызывается при каждом перезапуске скрипта, поэтому результат кэшируется)
+@st.cache_data(show_spinner=False, ttl=600)
 def load_api_key_from_secrets():
     """
     Загружает YouTube API ключ из файла secrets.toml
@@ -141,110 +146,84 @@ def render_video_api_tester_section():
         status_message.info(f"Подготовка к сбору данных о {len(video_urls)} видео...")
         progress_bar.progress(10)
         
-        # Создаем экземпляр анализатора YouTube только для работы с API
-        api_analyzer = YouTubeAnalyzer(headless=True, use_proxy=False)
+        # Анализатор YouTube только для работы с API (общий экземпляр без браузера)
+        api_analyzer = get_api_analyzer()
         
-        # Запускаем сбор данных
+        # Запускаем сбор данных: сначала извлекаем ID из всех ссылок (одновременно проверяя,
+        # что это ссылки на видео), затем запрашиваем данные пакетами videos.list
         videos_data = []
-        total_videos = len(video_urls)
         quota_exceeded = False
+        id_matches = [(url, _VIDEO_ID_RE.search(url)) for url in video_urls]
+        video_ids = [id_match.group(1) for _, id_match in id_matches if id_match]
         
-        for idx, url in enumerate(video_urls):
+        details_by_id = {}
+        if video_ids:
+            status_message.info(f"Запрос данных о {len(video_ids)} видео через YouTube API...")
+            progress_bar.progress(30)
+            api_error = None
             try:
-                # Если квота превышена, прекращаем обработку
+                details_by_id, api_error = api_analyzer.get_videos_details_api(video_ids, api_key)
+            except Exception as e:
+                logger.exception(f"Ошибка при пакетном получении данных о видео: {str(e)}")
+                status_message.error(f"Ошибка при получении данных о видео: {str(e)}")
+            
+            # Проверяем, не превышена ли квота API
+            if 'quotaExceeded' in str(api_error):
+                quota_exceeded = True
+                st.session_state["api_quota_exceeded"] = True
+        
+        progress_bar.progress(90)
+        
+        for url, id_match in id_matches:
+            if not id_match:
+                status_message.warning(f"Не удалось определить ID видео для URL: {url}. Пропускаю...")
+                videos_data.append({
+                    "URL видео": url,
+                    "Заголовок видео": "❌ Не удалось определить ID видео",
+                    "Превью": "",
+                    "Дата публикации": "",
+                    "Количество просмотров": 0,
+                    "Категория": "Неизвестно",
+                    "Язык": "Неизвестно",
+                    "Транскрипция": "Недоступно"
+                })
+                continue
+            
+            video_id = id_match.group(1)
+            # URL без параметров строится из ID, повторный разбор ссылки не нужен
+            clean_url = f"https://www.youtube.com/watch?v={video_id}"
+            video_details = details_by_id.get(video_id)
+            
+            if not video_details:
+                # Видео, до которых запросы не дошли из-за исчерпанной квоты, в таблицу не попадают
                 if quota_exceeded:
-                    break
-                
-                # Обновляем прогресс
-                progress = int(10 + (idx / total_videos) * 80)
-                progress_bar.progress(progress)
-                status_message.info(f"Обработка видео {idx+1}/{total_videos}: {url}")
-                
-                # Очищаем URL от параметров
-                clean_url = clean_youtube_url(url)
-                
-                # Извлекаем ID видео из URL
-                video_id = None
-                if "youtube.com/watch?v=" in url:
-                    video_id = url.split("watch?v=")[1].split("&")[0]
-                elif "youtu.be/" in url:
-                    video_id = url.split("youtu.be/")[1].split("?")[0]
-                
-                if not video_id:
-                    status_message.warning(f"Не удалось определить ID видео для URL: {url}. Пропускаю...")
-                    videos_data.append({
-                        "URL видео": url,
-                        "Заголовок видео": "❌ Не удалось определить ID видео",
-                        "Превью": "",
-                        "Дата публикации": "",
-                        "Количество просмотров": 0,
-                        "Категория": "Неизвестно",
-                        "Язык": "Неизвестно",
-                        "Транскрипция": "Недоступно"
-                    })
-                    continue
-                
-                # Получаем данные о видео через API
-                video_details = api_analyzer._get_video_details_api(video_id, api_key)
-                
-                # Проверяем, не превышена ли квота API
-                if video_details is None and hasattr(api_analyzer, 'last_api_error') and 'quotaExceeded' in str(api_analyzer.last_api_error):
-                    quota_exceeded = True
-                    st.session_state["api_quota_exceeded"] = True
-                    status_message.error("⚠️ Квота YouTube API исчерпана. Дальнейшие запросы невозможны.")
-                    break
-                
-                if not video_details:
-                    status_message.warning(f"Не удалось получить данные о видео: {url}. Пропускаю...")
-                    videos_data.append({
-                        "URL видео": clean_url,
-                        "Заголовок видео": "❌ Не удалось получить данные",
-                        "ID видео": video_id,
-                        "Превью": "",
-                        "Дата публикации": "",
-                        "Количество просмотров": 0,
-                        "Категория": "Неизвестно",
-                        "Язык": "Неизвестно",
-                        "Транскрипция": "Недоступно"
-                    })
                     continue
-                
-                # Формируем запись с данными видео
-                video_data = {
+                status_message.warning(f"Не удалось получить данные о видео: {url}. Пропускаю...")
+                videos_data.append({
                     "URL видео": clean_url,
+                    "Заголовок видео": "❌ Не удалось получить данные",
                     "ID видео": video_id,
-                    "Заголовок видео": video_details.get("title", "Неизвестно"),
-                    "Превью": video_details.get("thumbnail_url", ""),
-                    "Дата публикации": video_details.get("publication_date", ""),
-                    "Количество просмотров": video_details.get("view_count", 0),
-                    "Категория": video_details.get("category", "Неизвестно"),
-                    "Язык": video_details.get("language", "Неизвестно"),
-                    "Транскрипция": video_details.get("transcript", "Недоступно")
-                }
-                
-                videos_data.append(video_data)
-                status_message.success(f"Успешно получены данные о видео: {video_details.get('title', 'Неизвестно')}")
-                
-            except Exception as e:
-                # Проверяем, не является ли ошибка связанной с квотой API
-                if "quota" in str(e).lower():
-                    quota_exceeded = True
-                    st.session_state["api_quota_exceeded"] = True
-                    status_message.error("⚠️ Квота YouTube API исчерпана. Дальнейшие запросы невозможны.")
-                    break
-                
-                status_message.error(f"Ошибка при обработке видео {url}: {str(e)}")
-                videos_data.append({
-                    "URL видео": url,
-                    "Заголовок видео": "❌ Ошибка при обработке",
                     "Превью": "",
                     "Дата публикации": "",
                     "Количество просмотров": 0,
                     "Категория": "Неизвестно",
                     "Язык": "Неизвестно",
-                    "Транскрипция": "Недоступно",
-                    "Ошибка": str(e)
+                    "Транскрипция": "Недоступно"
                 })
+                continue
+            
+            # Формируем запись с данными видео
+            videos_data.append({
+                "URL видео": clean_url,
+                "ID видео": video_id,
+                "Заголовок видео": video_details.get("title", "Неизвестно"),
+                "Превью": video_details.get("thumbnail_url", ""),
+                "Дата публикации": video_details.get("publication_date", ""),
+                "Количество просмотров": video_details.get("view_count", 0),
+                "Категория": video_details.get("category", "Неизвестно"),
+                "Язык": video_details.get("language", "Неизвестно"),
+                "Транскрипция": video_details.get("transcript", "Недоступно")
+            })
         
         # Завершаем прогресс
         progress_bar.progress(100)
@@ -293,18 +272,20 @@ def render_video_api_tester_section():
                 lambda x: f'<a href="{x}" target="_blank"><img src="{x}" width="120" /></a>' if x else ""
             )
         
-        # Отображаем таблицу с данными (с поддержкой HTML)
-        st.write(results_df.to_html(escape=False), unsafe_allow_html=True)
+        # Отображаем таблицу с данными (с поддержкой HTML), по одной странице
+        page_df = paginate_dataframe(results_df, key="video_api_test_results_page")
+        st.write(page_df.to_html(escape=False), unsafe_allow_html=True)
         
-        # Создаем ссылку для скачивания CSV
-        export_df = results_df.copy()
-        if "Превью (изображение)" in export_df.columns:
-            export_df = export_df.drop(columns=["Превью (изображение)"])
+        # Кнопка для скачивания CSV (байты передаются напрямую, без base64)
+        export_df = results_df.drop(columns=["Превью (изображение)"], errors="ignore")
         
-        csv = export_df.to_csv(index=False, sep='\t')
-        b64 = base64.b64encode(csv.encode()).decode()
-        href = f'<a href="data:file/csv;base64,{b64}" download="youtube_videos_api_data.csv" target="_blank">📊 Скачать данные о видео (CSV)</a>'
-        st.markdown(href, unsafe_allow_html=True)
+        csv = dataframe_to_csv_bytes(export_df, sep='\t')
+        st.download_button(
+            label="📊 Скачать данные о видео (CSV)",
+            data=csv,
+            file_name="youtube_videos_api_data.csv",
+            mime="text/csv",
+        )
 
 # Функция для создания кликабельной ссылки
 def make_clickable(url, text=None):
@@ -1,7 +1,12 @@
 import os
+import re
 import random
+import time
+from functools import lru_cache
+from io import TextIOWrapper
 import streamlit as st
-from typing import List, Dict, Optional, Tuple
+import pandas as pd
+from typing import List, Dict, Optional, Tuple, Callable
 import logging
 
 # Настройка логирования
@@ -9,6 +14,186 @@ logging.basicConfig(level=logging.INFO,
                     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+except ImportError:
+    pa = None
+
+def _arrow_csv_compatible(df: pd.DataFrame) -> bool:
+    """
+    Проверяет, что pyarrow запишет таблицу так же, как df.to_csv: совпадение
+    гарантировано только для целочисленных и строковых колонок (числа с плавающей
+    точкой, даты и логические значения pyarrow форматирует по-своему).
+    
+    Args:
+        df (pd.DataFrame): Таблица для экспорта.
+        
+    Returns:
+        bool: True, если таблицу можно записать через pyarrow.
+    """
+    return all(
+        pd.api.types.is_integer_dtype(dtype) or pd.api.types.is_string_dtype(dtype)
+        for dtype in df.dtypes
+    )
+
+@st.cache_data(show_spinner=False, max_entries=8)
+def dataframe_to_csv_bytes(df: pd.DataFrame, sep: str = ",") -> bytes:
+    """
+    Сериализует DataFrame в CSV/TSV для скачивания. Формат файла совпадает с df.to_csv:
+    заголовок всегда пишет pandas, а строки таблиц из целочисленных и строковых колонок
+    записываются через pyarrow (на C++ вместо построчного Python-writer pandas) с
+    кавычками только там, где они нужны. Остальные таблицы, а также окружение без
+    pyarrow, обрабатываются df.to_csv.
+    Кнопка скачивания создается при каждом перезапуске скрипта, поэтому результат
+    кэшируется по содержимому таблицы и сериализация выполняется один раз.
+    
+    Args:
+        df (pd.DataFrame): Таблица для экспорта.
+        sep (str): Разделитель колонок.
+        
+    Returns:
+        bytes: Содержимое файла в кодировке UTF-8.
+    """
+    if pa is not None and _arrow_csv_compatible(df):
+        try:
+            buf = pa.BufferOutputStream()
+            pa_csv.write_csv(
+                pa.Table.from_pandas(df, preserve_index=False),
+                buf,
+                write_options=pa_csv.WriteOptions(
+                    include_header=False, delimiter=sep, quoting_style="needed"
+                ),
+            )
+            header = df.iloc[:0].to_csv(index=False, sep=sep).encode('utf-8')
+            return header + buf.getvalue().to_pybytes()
+        except (pa.ArrowException, TypeError, ValueError) as e:
+            logger.debug(f"pyarrow не смог сериализовать таблицу, используется pandas: {e}")
+    return df.to_csv(index=False, sep=sep).encode('utf-8')
+
+# Количество строк таблицы результатов, отображаемых на одной странице
+_TABLE_PAGE_SIZE = 200
+
+def paginate_dataframe(df: pd.DataFrame, key: str, page_size: int = _TABLE_PAGE_SIZE) -> pd.DataFrame:
+    """
+    Возвращает одну страницу таблицы для отображения и выводит переключатель страниц.
+    В браузер передается только текущая страница, а не вся таблица; экспорт
+    по-прежнему выполняется из полной таблицы.
+    
+    Args:
+        df (pd.DataFrame): Полная таблица.
+        key (str): Ключ виджета выбора страницы.
+        page_size (int): Количество строк на странице.
+        
+    Returns:
+        pd.DataFrame: Срез таблицы для текущей страницы (или вся таблица, если она помещается на одну страницу).
+    """
+    if len(df) <= page_size:
+        return df
+    
+    pages = (len(df) + page_size - 1) // page_size
+    page = st.number_input(
+        f"Страница (всего {pages}, по {page_size} строк)",
+        min_value=1, max_value=pages, value=1, step=1, key=key
+    )
+    start = (int(page) - 1) * page_size
+    return df.iloc[start:start + page_size]
+
+# Минимальный интервал (в секундах) между обновлениями промежуточного статуса обработки
+_STATUS_UPDATE_INTERVAL = 0.25
+
+def throttled_status_updaters(status_text, progress_bar) -> Tuple[Callable[[str], None], Callable[[float], None]]:
+    """
+    Создает функции обновления статуса и полосы прогресса для циклов обработки.
+    Промежуточный статус выводится не чаще раза в _STATUS_UPDATE_INTERVAL секунд,
+    а полоса прогресса - только при изменении процента: каждое обновление элемента
+    Streamlit отправляется во фронтенд и перерисовывается.
+    
+    Args:
+        status_text: Элемент st.empty() для текста статуса.
+        progress_bar: Элемент st.progress().
+        
+    Returns:
+        Tuple[Callable[[str], None], Callable[[float], None]]: Функции (show_status, show_progress).
+    """
+    last_status_update = [0.0]
+    last_progress_percent = [-1]
+    
+    def show_status(message: str) -> None:
+        now = time.monotonic()
+        if now - last_status_update[0] >= _STATUS_UPDATE_INTERVAL:
+            status_text.text(message)
+            last_status_update[0] = now
+    
+    def show_progress(value: float) -> None:
+        percent = int(value * 100)
+        if percent != last_progress_percent[0]:
+            progress_bar.progress(value)
+            last_progress_percent[0] = percent
+    
+    return show_status, show_progress
+
+def html_links(urls: pd.Series) -> pd.Series:
+    """
+    Превращает колонку URL в кликабельные HTML-ссылки конкатенацией строк pandas,
+    без вызова Python-функции для каждой строки. Пустые и нестроковые значения
+    остаются без изменений.
+    
+    Args:
+        urls (pd.Series): Колонка с URL.
+        
+    Returns:
+        pd.Series: Колонка с HTML-ссылками.
+    """
+    # .str.len() дает NaN (или <NA> для строкового dtype pandas) для нестроковых и пропущенных
+    # значений, поэтому маска отбирает только непустые строки
+    if pd.api.types.is_string_dtype(urls) or urls.dtype == object:
+        mask = urls.str.len().gt(0).fillna(False).astype(bool)
+    else:
+        mask = pd.Series(False, index=urls.index)
+    if not mask.any():
+        return urls
+    
+    links = urls[mask]
+    result = urls.copy()
+    result[mask] = '<a href="' + links + '" target="_blank">' + links + '</a>'
+    return result
+
+@st.cache_data(show_spinner=False, max_entries=16)
+def parse_links(raw: str, youtube_only: bool = False) -> List[str]:
+    """
+    Разбивает введенный текст на ссылки (по одной на строку). Результат кэшируется по тексту,
+    поэтому перезапуски скрипта при изменении других виджетов не разбирают список заново.
+    
+    Args:
+        raw (str): Текст из поля ввода или загруженного файла.
+        youtube_only (bool): Оставлять только ссылки на YouTube.
+        
+    Returns:
+        List[str]: Список ссылок без пробелов по краям.
+    """
+    links = [line.strip() for line in raw.split("\n") if line.strip()]
+    if youtube_only:
+        links = list(filter(_YT_HOST_RE.search, links))
+    return links
+
+def read_uploaded_links(uploaded_file) -> List[str]:
+    """
+    Читает ссылки из загруженного файла построчно, не собирая весь текст файла в одну строку.
+    
+    Args:
+        uploaded_file: Файл из st.file_uploader.
+        
+    Returns:
+        List[str]: Список непустых строк файла без пробелов по краям.
+    """
+    wrapper = TextIOWrapper(uploaded_file, encoding="utf-8")
+    try:
+        return [line.strip() for line in wrapper if line.strip()]
+    finally:
+        # Отсоединяем обертку, чтобы при ее удалении не закрылся сам загруженный файл
+        wrapper.detach()
+
 def get_api_keys() -> Tuple[Optional[str], Optional[str]]:
     """
     Получает API ключи из секретов Streamlit.
@@ -32,6 +217,7 @@ def get_api_keys() -> Tuple[Optional[str], Optional[str]]:
         
     return openai_api_key, anthropic_api_key
 
+@st.cache_data(ttl=600, show_spinner=False)
 def get_proxy_list() -> List[Dict[str, str]]:
     """
     Получает список прокси из секретов Streamlit и форматирует их для использования.
@@ -84,6 +270,50 @@ def get_random_proxy(verified_proxies: List[Dict[str, str]] = None) -> Optional[
         
     return random.choice(proxies)
 
+# Скомпилированные шаблоны для определения типа YouTube URL
+_YT_HOST_RE = re.compile(r"youtube\.com|youtu\.be")
+_YT_VIDEO_RE = re.compile(r"youtube\.com/watch|youtu\.be/")
+_YT_CHANNEL_RE = re.compile(r"youtube\.com/(?:channel/|c/|user/|@|profile)|/featured|/videos")
+
+@lru_cache(maxsize=100_000)
+def classify_youtube_url(url: str) -> str:
+    """
+    Определяет тип ссылки за один проход скомпилированных регулярных выражений.
+    Результат кэшируется, так как одни и те же ссылки проверяются многократно.
+    
+    Args:
+        url (str): URL для анализа (без пробелов по краям)
+        
+    Returns:
+        str: "video", "channel", "unknown" (ссылка YouTube неизвестного типа) или "invalid"
+    """
+    if not url or not _YT_HOST_RE.search(url):
+        return "invalid"
+    if _YT_VIDEO_RE.search(url):
+        return "video"
+    if _YT_CHANNEL_RE.search(url):
+        return "channel"
+    return "unknown"
+
+# Уже очищенная ссылка: префикс и ID видео из 11 допустимых символов без параметров
+_WATCH_URL_PREFIX = "https://www.youtube.com/watch?v="
+_VIDEO_ID_CHARS = frozenset("ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789_-")
+_CLEAN_WATCH_URL_LEN = len(_WATCH_URL_PREFIX) + 11
+
+def is_clean_watch_url(url: str) -> bool:
+    """
+    Проверяет, что ссылка уже очищена (https://www.youtube.com/watch?v=ID без параметров):
+    быстрый путь функций очистки URL, большинство ссылок рекомендаций уже в таком виде.
+    
+    Args:
+        url (str): URL для проверки.
+        
+    Returns:
+        bool: True, если ссылку не нужно очищать.
+    """
+    return (len(url) == _CLEAN_WATCH_URL_LEN and url.startswith(_WATCH_URL_PREFIX)
+            and _VIDEO_ID_CHARS.issuperset(url[len(_WATCH_URL_PREFIX):]))
+
 def parse_youtube_url(url: str) -> Tuple[str, bool]:
     """
     Определяет тип YouTube URL (канал или видео).
@@ -98,44 +328,24 @@ def parse_youtube_url(url: str) -> Tuple[str, bool]:
         return "", False
         
     url = url.strip()
+    url_type = classify_youtube_url(url)
     
     # Проверка наличия YouTube в URL
-    if not ('youtube.com' in url or 'youtu.be' in url):
+    if url_type == "invalid":
         logger.warning(f"URL не является ссылкой на YouTube: {url}")
         return url, False
     
-    # Проверка на URL канала
-    channel_indicators = [
-        "youtube.com/channel/", 
-        "youtube.com/c/", 
-        "youtube.com/user/",
-        "youtube.com/@",
-        "youtube.com/profile",
-        "/featured",
-        "/videos"
-    ]
-    
-    # Прямая проверка на URL видео
-    video_indicators = [
-        "youtube.com/watch",
-        "youtu.be/"
-    ]
-    
-    is_video = any(indicator in url for indicator in video_indicators)
-    
     # Если это явно видео, возвращаем False для is_channel
-    if is_video:
+    if url_type == "video":
         logger.info(f"Определено как URL видео: {url}")
         return url, False
     
     # Если это явно канал или плейлист с видео
-    is_channel = any(indicator in url for indicator in channel_indicators)
-    
-    if is_channel:
+    if url_type == "channel":
         logger.info(f"Определено как URL канала: {url}")
         
         # Исправляем URL канала, если он не содержит /videos в конце
-        if not url.endswith("/videos") and "/videos" not in url:
+        if "/videos" not in url:
             if url.endswith("/"):
                 url = f"{url}videos"
             else:
@@ -3,12 +3,16 @@ import time
 import base64
 import random
 import logging
-import traceback
 import json
 import re
+import hashlib
+import http.cookiejar
+import concurrent.futures
 from datetime import datetime, timedelta
 from typing import List, Dict, Optional, Any, Tuple
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from io import BytesIO
 from selenium import webdriver
 from selenium.webdriver.chrome.service import Service
@@ -21,10 +25,6 @@ from selenium.common.exceptions import (
     TimeoutException, NoSuchElementException, 
     StaleElementReferenceException, WebDriverException
 )
-# Изменяем импорт для совместимости с версией 3.4.6
-import undetected_chromedriver as uc
-from webdriver_manager.chrome import ChromeDriverManager
-from PIL import Image
 import pandas as pd
 import tempfile
 import zipfile
@@ -38,12 +38,119 @@ logging.basicConfig(level=logging.INFO,
                     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+def _create_http_session() -> requests.Session:
+    """
+    Создает HTTP-сессию с пулом соединений и повторными попытками.
+    
+    Returns:
+        requests.Session: Сессия, переиспользующая TCP/TLS соединения с youtube.com и i.ytimg.com.
+    """
+    session = requests.Session()
+    # Сессия общая для всех пользователей и потоков, поэтому cookies из ответов (например,
+    # VISITOR_INFO1_LIVE и YSC от YouTube) не сохраняются: общими остаются только соединения,
+    # и каждый запрос, как прежде при requests.get, уходит без состояния прошлых запросов
+    session.cookies.set_policy(http.cookiejar.DefaultCookiePolicy(allowed_domains=[]))
+    # Повторяем только временные ошибки (обрывы соединения, 429 и 5xx) с экспоненциальной
+    # задержкой; после исчерпания попыток возвращаем последний ответ, чтобы вызывающий код
+    # проверил status_code как раньше
+    retry_policy = Retry(
+        total=3,
+        backoff_factor=0.3,
+        status_forcelist=(429, 500, 502, 503, 504),
+        allowed_methods=frozenset({"GET", "HEAD"}),
+        respect_retry_after_header=True,
+        raise_on_status=False
+    )
+    adapter = HTTPAdapter(
+        pool_connections=50,
+        pool_maxsize=50,
+        max_retries=retry_policy
+    )
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+# Общая сессия для всех HTTP-запросов анализатора (без хранения cookies).
+# Для запросов через прокси адаптер сам держит отдельный пул соединений на каждый прокси.
+_SESSION = _create_http_session()
+
+def get_http_session() -> requests.Session:
+    """
+    Возвращает общую HTTP-сессию приложения с пулом соединений и повторами запросов.
+    
+    Returns:
+        requests.Session: Сессия, общая для анализатора и модулей работы с YouTube API.
+    """
+    return _SESSION
+
+# Пул потоков для фоновых HTTP-запросов, которые можно выполнять параллельно с основными
+_BACKGROUND_EXECUTOR = concurrent.futures.ThreadPoolExecutor(max_workers=8)
+
+# Количество потоков для параллельной загрузки страниц видео в test_video_parameters_fast
+_VIDEO_PARAMS_WORKERS = 8
+
+# Начало JSON-объектов с данными страницы просмотра
+_INITIAL_DATA_RE = re.compile(r'ytInitialData\s*=\s*(?=\{)')
+_PLAYER_RESPONSE_RE = re.compile(r'var ytInitialPlayerResponse\s*=\s*(?=\{)')
+_JSON_DECODER = json.JSONDecoder()
+
+def _extract_json_object(html_content: str, marker_re: re.Pattern) -> Optional[Dict[str, Any]]:
+    """
+    Извлекает JSON-объект, встроенный в HTML после маркера (например, "ytInitialData = ").
+    Объект разбирается JSON-декодером прямо с места маркера, без поиска конца объекта
+    регулярным выражением по всей странице.
+    
+    Args:
+        html_content (str): HTML страницы.
+        marker_re (re.Pattern): Шаблон маркера, после которого начинается объект.
+        
+    Returns:
+        Optional[Dict[str, Any]]: Разобранный объект или None, если маркер не найден.
+        
+    Raises:
+        ValueError: Если после маркера находится некорректный JSON.
+    """
+    match = marker_re.search(html_content)
+    if not match:
+        return None
+    data, _ = _JSON_DECODER.raw_decode(html_content, match.end())
+    return data
+
+# Ссылки на видео на странице просмотра: относительные href и ID видео из встроенного JSON.
+# Один шаблон позволяет собрать оба вида ссылок за один проход по HTML (страница весит ~1 МБ)
+_WATCH_LINK_RE = re.compile(r'href="(/watch\?v=[^"&]+)|videoId":"([a-zA-Z0-9_-]{11})"')
+
+# Максимальное количество ID видео в одном запросе videos.list YouTube Data API
+_VIDEOS_LIST_BATCH_SIZE = 50
+
+# Cookies, которые Google выставляет только после входа в аккаунт: по ним проверяется,
+# что авторизация из сохраненного профиля действительно восстановлена
+_GOOGLE_SESSION_COOKIES = frozenset({"SID", "__Secure-1PSID"})
+
+# Каталог постоянных профилей Chrome: cookies авторизации Google сохраняются между
+# запусками, и повторный вход выполняется без прохождения формы логина
+_SESSIONS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "sessions")
+
+def _profile_dir_for(email: str) -> str:
+    """
+    Возвращает путь к профилю Chrome для аккаунта (имя каталога - хэш email).
+    
+    Args:
+        email (str): Email аккаунта Google.
+        
+    Returns:
+        str: Путь к каталогу профиля.
+    """
+    digest = hashlib.blake2b(email.strip().lower().encode(), digest_size=16).hexdigest()
+    return os.path.join(_SESSIONS_DIR, digest)
+
 class YouTubeAnalyzer:
     """
     Класс для анализа видео на YouTube с использованием Selenium.
     """
     
-    def __init__(self, headless: bool = True, use_proxy: bool = True, google_account: Dict[str, str] = None):
+    def __init__(self, headless: bool = True, use_proxy: bool = True, google_account: Dict[str, str] = None,
+                 session: Optional[requests.Session] = None, persist_profile: bool = False):
         """
         Инициализация анализатора YouTube.
         
@@ -52,7 +159,13 @@ class YouTubeAnalyzer:
             use_proxy (bool): Использовать прокси-сервера.
             google_account (Dict[str, str], optional): Аккаунт Google для авторизации. 
                                                        Должен содержать 'email' и 'password'.
+            session (requests.Session, optional): HTTP-сессия для запросов без браузера.
+                                                  По умолчанию используется общая сессия модуля.
+            persist_profile (bool): Хранить профиль Chrome аккаунта на диске, чтобы cookies
+                                    авторизации сохранялись между запусками (cookies
+                                    хранятся незашифрованными, поэтому по умолчанию выключено).
         """
+        self.session = session or _SESSION
         self.headless = headless
         self.use_proxy = use_proxy
         self.google_account = google_account
@@ -60,6 +173,9 @@ class YouTubeAnalyzer:
         self.current_proxy = None
         self.proxy_list = None  # Список проверенных прокси
         self.is_logged_in = False  # Флаг авторизации
+        self.profile_dir = None  # Каталог постоянного профиля Chrome (если используется)
+        if persist_profile and google_account and google_account.get("email"):
+            self.profile_dir = _profile_dir_for(google_account["email"])
         
     def setup_driver(self) -> None:
         """
@@ -119,6 +235,12 @@ class YouTubeAnalyzer:
             chrome_options.add_argument("--allow-running-insecure-content")
             chrome_options.add_argument("--disable-setuid-sandbox")
             
+            # Постоянный профиль аккаунта: Chrome сам сохраняет в нем cookies после входа
+            if self.profile_dir:
+                os.makedirs(self.profile_dir, exist_ok=True)
+                chrome_options.add_argument(f"--user-data-dir={self.profile_dir}")
+                logger.info(f"Используем сохраненный профиль Chrome: {self.profile_dir}")
+            
             # Настраиваем прокси, если нужно
             if self.use_proxy:
                 # Обновляем список прокси, если он пустой
@@ -214,8 +336,7 @@ class YouTubeAnalyzer:
                     self.login_to_google()
         
         except Exception as e:
-            logger.error(f"Критическая ошибка при настройке драйвера: {e}")
-            traceback.print_exc()
+            logger.exception(f"Критическая ошибка при настройке драйвера: {e}")
             self.driver = None
         
     def _handle_proxy_auth(self) -> None:
@@ -288,6 +409,21 @@ class YouTubeAnalyzer:
         # Сокращаем время задержек значительно
         delay = random.uniform(min_seconds, max_seconds)
         time.sleep(delay)
+    
+    def _navigate_without_wait(self, url: str) -> None:
+        """
+        Открывает страницу через CDP-команду Page.navigate, не дожидаясь полной загрузки
+        (driver.get блокируется до document.readyState == 'complete'). Используется там,
+        где после перехода все равно выполняется ожидание, например при просмотре видео.
+        
+        Args:
+            url (str): URL страницы.
+        """
+        try:
+            self.driver.execute_cdp_cmd("Page.navigate", {"url": url})
+        except Exception as e:
+            logger.debug(f"Page.navigate недоступен, используется driver.get: {e}")
+            self.driver.get(url)
                 
     def get_last_videos_from_channel(self, channel_url: str, limit: int = 20) -> List[Dict[str, Any]]:
         """
@@ -312,8 +448,7 @@ class YouTubeAnalyzer:
                     logger.error("Не удалось инициализировать драйвер в get_last_videos_from_channel")
                     return []
             except Exception as e:
-                logger.error(f"Ошибка при инициализации драйвера в get_last_videos_from_channel: {e}")
-                traceback.print_exc()
+                logger.exception(f"Ошибка при инициализации драйвера в get_last_videos_from_channel: {e}")
                 return []
         
         try:
@@ -450,8 +585,7 @@ class YouTubeAnalyzer:
             logger.info(f"Найдено {len(videos)} видео на канале {channel_url}")
             
         except Exception as e:
-            logger.error(f"Ошибка при получении видео с канала {channel_url}: {e}")
-            traceback.print_exc()
+            logger.exception(f"Ошибка при получении видео с канала {channel_url}: {e}")
             
         return videos
         
@@ -752,8 +886,7 @@ class YouTubeAnalyzer:
             return recommendations
         
         except Exception as e:
-            logger.error(f"Ошибка при получении рекомендаций для видео {video_url}: {e}")
-            traceback.print_exc()
+            logger.exception(f"Ошибка при получении рекомендаций для видео {video_url}: {e}")
             return []
 
     def _scroll_to_recommendations(self) -> None:
@@ -781,7 +914,7 @@ class YouTubeAnalyzer:
         except Exception as e:
             logger.warning(f"Ошибка при прокрутке к рекомендациям: {e}")
 
-    def download_thumbnail(self, thumbnail_url: str) -> Optional[Image.Image]:
+    def download_thumbnail(self, thumbnail_url: str) -> Optional["Image.Image"]:
         """
         Загружает миниатюру видео.
         
@@ -807,7 +940,7 @@ class YouTubeAnalyzer:
                 "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
             }
             
-            response = requests.get(
+            response = self.session.get(
                 thumbnail_url, 
                 headers=headers, 
                 proxies=proxies, 
@@ -815,6 +948,9 @@ class YouTubeAnalyzer:
             )
             
             if response.status_code == 200:
+                # Pillow импортируется только здесь: миниатюры загружаются редко,
+                # а импорт на уровне модуля замедлял запуск приложения
+                from PIL import Image
                 img = Image.open(BytesIO(response.content))
                 return img
             else:
@@ -1078,8 +1214,7 @@ class YouTubeAnalyzer:
             return None
             
         except Exception as e:
-            logger.error(f"Ошибка при извлечении имени канала для {channel_url}: {e}")
-            traceback.print_exc()
+            logger.exception(f"Ошибка при извлечении имени канала для {channel_url}: {e}")
             return None
 
     def _get_channel_videos_api(self, channel_id: str, limit: int = 5) -> List[Dict[str, Any]]:
@@ -1110,7 +1245,7 @@ class YouTubeAnalyzer:
                 "Accept-Language": "ru-RU,ru;q=0.9,en-US;q=0.8,en;q=0.7"
             }
             
-            response = requests.get(channel_url, headers=headers, timeout=10)
+            response = self.session.get(channel_url, headers=headers, timeout=10)
             
             if response.status_code == 200:
                 html = response.text
@@ -1447,8 +1582,7 @@ class YouTubeAnalyzer:
             return video_info
         
         except Exception as e:
-            logger.error(f"Ошибка при извлечении данных о видео: {e}")
-            traceback.print_exc()
+            logger.exception(f"Ошибка при извлечении данных о видео: {e}")
             # Возвращаем пустой словарь, если произошла ошибка
             return video_info
 
@@ -1550,8 +1684,7 @@ class YouTubeAnalyzer:
                             logger.warning(f"Видео не найдены в разделе '{section}' для канала {channel_url}")
                             
                     except Exception as section_err:
-                        logger.error(f"Ошибка при обработке раздела '{section}' для канала {channel_url}: {section_err}")
-                        traceback.print_exc()
+                        logger.exception(f"Ошибка при обработке раздела '{section}' для канала {channel_url}: {section_err}")
                 
                 # Если имя канала все еще не получено, попробуем получить его напрямую
                 if not channel_info["name"]:
@@ -1571,8 +1704,7 @@ class YouTubeAnalyzer:
                 results["channels_processed"] += 1
                 
             except Exception as channel_err:
-                logger.error(f"Ошибка при обработке канала {channel_url}: {channel_err}")
-                traceback.print_exc()
+                logger.exception(f"Ошибка при обработке канала {channel_url}: {channel_err}")
                 results["channels_failed"] += 1
                 
                 # Проверим состояние драйвера и при необходимости переинициализируем
@@ -1658,7 +1790,7 @@ class YouTubeAnalyzer:
                 headers = {
                     "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
                 }
-                response = requests.get(channel_url, headers=headers, timeout=10)
+                response = self.session.get(channel_url, headers=headers, timeout=10)
                 
                 if response.status_code == 200:
                     # Извлекаем ссылки на видео из HTML
@@ -1749,8 +1881,7 @@ class YouTubeAnalyzer:
             return videos[:limit]
             
         except Exception as e:
-            logger.error(f"Ошибка при получении видео с канала {channel_url}: {e}")
-            traceback.print_exc()
+            logger.exception(f"Ошибка при получении видео с канала {channel_url}: {e}")
             
             # В случае ошибки пытаемся получить видео через альтернативный метод
             try:
@@ -1837,7 +1968,7 @@ class YouTubeAnalyzer:
                     }
                     
                     try:
-                        search_response = requests.get(search_url, params=search_params)
+                        search_response = self.session.get(search_url, params=search_params)
                         
                         if search_response.status_code == 200:
                             search_data = search_response.json()
@@ -1876,7 +2007,7 @@ class YouTubeAnalyzer:
                     }
                     
                     try:
-                        search_response = requests.get(search_url, params=search_params)
+                        search_response = self.session.get(search_url, params=search_params)
                         
                         if search_response.status_code == 200:
                             search_data = search_response.json()
@@ -1907,7 +2038,7 @@ class YouTubeAnalyzer:
                 }
                 
                 try:
-                    search_response = requests.get(search_url, params=search_params)
+                    search_response = self.session.get(search_url, params=search_params)
                     
                     if search_response.status_code == 200:
                         search_data = search_response.json()
@@ -1980,7 +2111,7 @@ class YouTubeAnalyzer:
             }
             
             logger.info(f"Запрос деталей канала {channel_id}: {base_url} с параметрами {params}")
-            response = requests.get(base_url, params=params)
+            response = self.session.get(base_url, params=params)
             
             if response.status_code != 200:
                 logger.warning(f"Ошибка API при получении деталей канала: {response.status_code}")
@@ -2063,121 +2194,179 @@ class YouTubeAnalyzer:
             return result
             
         except Exception as e:
-            logger.error(f"Ошибка при получении деталей канала {channel_id} через API: {str(e)}")
-            logger.error(traceback.format_exc())
+            logger.exception(f"Ошибка при получении деталей канала {channel_id} через API: {str(e)}")
             return None
 
-    def _get_video_details_api(self, video_id: str, api_key: str) -> Optional[Dict[str, Any]]:
+    def get_videos_details_api(self, video_ids: List[str], api_key: str) -> Tuple[Dict[str, Dict[str, Any]], Optional[str]]:
         """
-        Получает детальную информацию о видео через API.
+        Получает детальную информацию о нескольких видео через API. ID передаются в videos.list
+        пакетами по _VIDEOS_LIST_BATCH_SIZE (до 50 через запятую), то есть один HTTP-запрос
+        вместо отдельного запроса на каждое видео.
+        Ошибка API возвращается вызывающему коду, а не сохраняется в анализаторе:
+        экземпляр для работы с API общий для всех сессий.
         
         Args:
-            video_id (str): ID видео
+            video_ids (List[str]): Список ID видео
             api_key (str): Ключ API YouTube
             
         Returns:
-            Optional[Dict[str, Any]]: Словарь с информацией о видео или None в случае ошибки
+            Tuple[Dict[str, Dict[str, Any]], Optional[str]]: Информация о видео по их ID (видео без данных
+                отсутствуют в словаре) и текст последнего ответа API с ошибкой (None, если ошибок не было)
         """
-        try:
-            base_url = "https://www.googleapis.com/youtube/v3/videos"
-            params = {
-                'part': 'snippet,statistics,contentDetails',
-                'id': video_id,
-                'key': api_key
-            }
-            
-            logger.info(f"Запрос деталей видео {video_id}: {base_url} с параметрами {params}")
-            response = requests.get(base_url, params=params)
-            
-            if response.status_code != 200:
-                logger.warning(f"Ошибка API при получении деталей видео: {response.status_code}")
-                logger.warning(f"Ответ API: {response.text}")
-                return None
+        video_ids = list(dict.fromkeys(video_ids))
+        requested_ids = set(video_ids)
+        
+        results = {}
+        api_error = None
+        base_url = "https://www.googleapis.com/youtube/v3/videos"
+        
+        for i in range(0, len(video_ids), _VIDEOS_LIST_BATCH_SIZE):
+            batch = video_ids[i:i + _VIDEOS_LIST_BATCH_SIZE]
+            try:
+                params = {
+                    'part': 'snippet,statistics,contentDetails',
+                    'id': ",".join(batch),
+                    'maxResults': _VIDEOS_LIST_BATCH_SIZE,
+                    'key': api_key
+                }
                 
-            data = response.json()
-            
-            if not data.get('items'):
-                logger.warning(f"API не вернул данные для видео {video_id}")
-                return None
+                logger.info(f"Запрос деталей {len(batch)} видео одним запросом к {base_url}")
+                response = self.session.get(base_url, params=params)
                 
-            video_info = data['items'][0]
-            snippet = video_info.get('snippet', {})
-            statistics = video_info.get('statistics', {})
-            content_details = video_info.get('contentDetails', {})
-            
-            # Форматирование даты публикации
-            published_at = snippet.get('publishedAt')
-            formatted_date = None
-            
-            if published_at:
-                try:
-                    # Обработка формата даты
-                    if '.' in published_at:
-                        # Если есть микросекунды, отрезаем их
-                        date_part = published_at.split('.')[0]
-                        published_date = datetime.strptime(date_part + 'Z', "%Y-%m-%dT%H:%M:%SZ")
-                    else:
-                        # Для формата без микросекунд
-                        published_date = datetime.strptime(published_at, "%Y-%m-%dT%H:%M:%SZ")
-                    
-                    # Форматируем дату в нужный формат
-                    formatted_date = published_date.strftime("%Y-%m-%d %H:%M")
-                except ValueError as e:
-                    logger.warning(f"Не удалось обработать дату публикации видео: {published_at}, ошибка: {e}")
+                if response.status_code != 200:
+                    logger.warning(f"Ошибка API при получении деталей видео: {response.status_code}")
+                    logger.warning(f"Ответ API: {response.text}")
+                    api_error = response.text
+                    if 'quotaExceeded' in response.text:
+                        # При исчерпанной квоте следующие пакеты тоже не будут обработаны
+                        break
+                    continue
+                
+                items = [
+                    video_info for video_info in response.json().get('items', [])
+                    if video_info.get('id') in requested_ids
+                ]
+                
+                # Список субтитров запрашивается отдельно для каждого видео, поэтому эти запросы
+                # запускаем в фоне только для ID, которые videos.list подтвердил в этом пакете
+                transcript_futures = {
+                    video_info['id']: _BACKGROUND_EXECUTOR.submit(self._get_video_transcript, video_info['id'], api_key)
+                    for video_info in items
+                }
+                
+                for video_info in items:
+                    video_id = video_info['id']
+                    try:
+                        results[video_id] = self._parse_video_item(video_info, api_key, transcript_futures[video_id])
+                    except Exception as e:
+                        logger.exception(f"Ошибка при обработке данных видео {video_id}: {str(e)}")
+                        
+            except Exception as e:
+                logger.exception(f"Ошибка при получении деталей видео {', '.join(batch)} через API: {str(e)}")
+        
+        missing = [video_id for video_id in video_ids if video_id not in results]
+        if missing:
+            logger.warning(f"API не вернул данные для видео: {', '.join(missing)}")
+        
+        return results, api_error
+    
+    def _parse_video_item(self, video_info: Dict[str, Any], api_key: str,
+                          transcript_future: concurrent.futures.Future) -> Dict[str, Any]:
+        """
+        Преобразует элемент ответа videos.list в словарь с информацией о видео.
+        
+        Args:
+            video_info (Dict[str, Any]): Элемент items из ответа API
+            api_key (str): Ключ API YouTube
+            transcript_future (concurrent.futures.Future): Запрос списка субтитров, запущенный в фоне
             
-            # Получаем количество просмотров
-            view_count = 0
+        Returns:
+            Dict[str, Any]: Словарь с информацией о видео
+        """
+        video_id = video_info.get('id')
+        snippet = video_info.get('snippet', {})
+        statistics = video_info.get('statistics', {})
+        content_details = video_info.get('contentDetails', {})
+        
+        # Форматирование даты публикации
+        published_at = snippet.get('publishedAt')
+        formatted_date = None
+        
+        if published_at:
             try:
-                view_count = int(statistics.get('viewCount', 0))
-            except (ValueError, TypeError):
-                logger.warning(f"Не удалось преобразовать viewCount в число: {statistics.get('viewCount')}")
-            
-            # Получаем URL превью
-            thumbnail_url = ""
-            thumbnails = snippet.get('thumbnails', {})
-            if 'maxres' in thumbnails:
-                thumbnail_url = thumbnails['maxres'].get('url', '')
-            elif 'high' in thumbnails:
-                thumbnail_url = thumbnails['high'].get('url', '')
-            elif 'medium' in thumbnails:
-                thumbnail_url = thumbnails['medium'].get('url', '')
-            elif 'standard' in thumbnails:
-                thumbnail_url = thumbnails['standard'].get('url', '')
-            elif 'default' in thumbnails:
-                thumbnail_url = thumbnails['default'].get('url', '')
-            
-            # Получаем транскрипцию (для этого требуется отдельный запрос к API captions)
-            transcript = self._get_video_transcript(video_id, api_key)
-            
-            # Получаем название категории видео
-            category_id = snippet.get('categoryId', '')
-            category_name = "Неизвестно"
-            if category_id:
-                category_name = self._get_video_category_name(category_id, api_key)
-            
-            # Формируем результат
-            result = {
-                "id": video_id,
-                "url": f"https://www.youtube.com/watch?v={video_id}",
-                "title": snippet.get('title', 'Неизвестно'),
-                "description": snippet.get('description', ''),
-                "channel_title": snippet.get('channelTitle', 'Неизвестно'),
-                "channel_id": snippet.get('channelId', ''),
-                "publication_date": formatted_date,
-                "view_count": view_count,
-                "category": category_name,
-                "language": snippet.get('defaultLanguage', snippet.get('defaultAudioLanguage', 'Неизвестно')),
-                "thumbnail_url": thumbnail_url,
-                "transcript": transcript
-            }
-            
-            logger.info(f"Получены детали видео: {result['title']}, просмотров: {result['view_count']}")
-            return result
+                # Обработка формата даты
+                if '.' in published_at:
+                    # Если есть микросекунды, отрезаем их
+                    date_part = published_at.split('.')[0]
+                    published_date = datetime.strptime(date_part + 'Z', "%Y-%m-%dT%H:%M:%SZ")
+                else:
+                    # Для формата без микросекунд
+                    published_date = datetime.strptime(published_at, "%Y-%m-%dT%H:%M:%SZ")
+                
+                # Форматируем дату в нужный формат
+                formatted_date = published_date.strftime("%Y-%m-%d %H:%M")
+            except ValueError as e:
+                logger.warning(f"Не удалось обработать дату публикации видео: {published_at}, ошибка: {e}")
+        
+        # Получаем количество просмотров
+        view_count = 0
+        try:
+            view_count = int(statistics.get('viewCount', 0))
+        except (ValueError, TypeError):
+            logger.warning(f"Не удалось преобразовать viewCount в число: {statistics.get('viewCount')}")
+        
+        # Получаем URL превью
+        thumbnail_url = ""
+        thumbnails = snippet.get('thumbnails', {})
+        if 'maxres' in thumbnails:
+            thumbnail_url = thumbnails['maxres'].get('url', '')
+        elif 'high' in thumbnails:
+            thumbnail_url = thumbnails['high'].get('url', '')
+        elif 'medium' in thumbnails:
+            thumbnail_url = thumbnails['medium'].get('url', '')
+        elif 'standard' in thumbnails:
+            thumbnail_url = thumbnails['standard'].get('url', '')
+        elif 'default' in thumbnails:
+            thumbnail_url = thumbnails['default'].get('url', '')
+        
+        # Получаем название категории видео
+        category_id = snippet.get('categoryId', '')
+        category_name = "Неизвестно"
+        if category_id:
+            category_name = self._get_video_category_name(category_id, api_key)
+        
+        # Формируем результат
+        result = {
+            "id": video_id,
+            "url": f"https://www.youtube.com/watch?v={video_id}",
+            "title": snippet.get('title', 'Неизвестно'),
+            "description": snippet.get('description', ''),
+            "channel_title": snippet.get('channelTitle', 'Неизвестно'),
+            "channel_id": snippet.get('channelId', ''),
+            "publication_date": formatted_date,
+            "view_count": view_count,
+            "category": category_name,
+            "language": snippet.get('defaultLanguage', snippet.get('defaultAudioLanguage', 'Неизвестно')),
+            "thumbnail_url": thumbnail_url,
+            "transcript": transcript_future.result()
+        }
+        
+        logger.info(f"Получены детали видео: {result['title']}, просмотров: {result['view_count']}")
+        return result
+    
+    def _get_video_details_api(self, video_id: str, api_key: str) -> Optional[Dict[str, Any]]:
+        """
+        Получает детальную информацию о видео через API.
+        
+        Args:
+            video_id (str): ID видео
+            api_key (str): Ключ API YouTube
             
-        except Exception as e:
-            logger.error(f"Ошибка при получении деталей видео {video_id} через API: {str(e)}")
-            logger.error(traceback.format_exc())
-            return None
+        Returns:
+            Optional[Dict[str, Any]]: Словарь с информацией о видео или None в случае ошибки
+        """
+        results, _ = self.get_videos_details_api([video_id], api_key)
+        return results.get(video_id)
             
     def _get_video_transcript(self, video_id: str, api_key: str) -> str:
         """
@@ -2200,7 +2389,7 @@ class YouTubeAnalyzer:
             }
             
             logger.info(f"Запрос списка субтитров для видео {video_id}")
-            captions_response = requests.get(captions_url, params=captions_params)
+            captions_response = self.session.get(captions_url, params=captions_params)
             
             if captions_response.status_code != 200:
                 logger.warning(f"Ошибка API при получении списка субтитров: {captions_response.status_code}")
@@ -2284,7 +2473,7 @@ class YouTubeAnalyzer:
             }
             
             logger.info(f"Запрос категории видео {category_id}")
-            response = requests.get(base_url, params=params)
+            response = self.session.get(base_url, params=params)
             
             if response.status_code != 200:
                 logger.warning(f"Ошибка API при получении категории видео: {response.status_code}")
@@ -2342,6 +2531,20 @@ class YouTubeAnalyzer:
                 except:
                     pass
             
+            # В сохраненном профиле могут остаться cookies прошлого входа. Отсутствие перенаправления
+            # на форму входа ничего не доказывает (без входа Google может показать страницу-заставку),
+            # поэтому проверяем наличие cookies сессии на домене google.com
+            if self.profile_dir:
+                try:
+                    self.driver.get("https://myaccount.google.com")
+                    cookie_names = {cookie.get("name") for cookie in self.driver.get_cookies()}
+                    if cookie_names & _GOOGLE_SESSION_COOKIES:
+                        logger.info(f"Авторизация восстановлена из сохраненного профиля ({email})")
+                        self.is_logged_in = True
+                        return True
+                except Exception as e:
+                    logger.warning(f"Не удалось проверить сохраненную авторизацию: {e}")
+            
             # Переходим на страницу авторизации Google
             self.driver.get("https://accounts.google.com/signin")
             
@@ -2623,8 +2826,7 @@ class YouTubeAnalyzer:
             return False
                 
         except Exception as e:
-            logger.error(f"Ошибка при авторизации в Google: {e}")
-            traceback.print_exc()
+            logger.exception(f"Ошибка при авторизации в Google: {e}")
             return False
     
     def prewatch_videos(self, video_urls: List[str], min_watch_time: int = 15, max_watch_time: int = 45, 
@@ -2659,8 +2861,9 @@ class YouTubeAnalyzer:
             try:
                 logger.info(f"Просмотр видео {idx+1}/{len(video_urls)}: {url}")
                 
-                # Загружаем страницу видео
-                self.driver.get(url)
+                # Начинаем загрузку страницы видео, не блокируясь до ее завершения:
+                # плеер успевает инициализироваться во время паузы ниже
+                self._navigate_without_wait(url)
                 
                 # Ждем загрузки видео
                 self._random_sleep(2.0, 3.0)
@@ -2795,7 +2998,7 @@ class YouTubeAnalyzer:
                                 
                                 if rec_url and "watch?v=" in rec_url:
                                     logger.info(f"Переход по рекомендации на {rec_url}")
-                                    self.driver.get(rec_url)
+                                    self._navigate_without_wait(rec_url)
                                     
                                     # Проверяем рекламу на новом видео
                                     self._random_sleep(2.0, 3.0)
@@ -2955,321 +3158,348 @@ class YouTubeAnalyzer:
         # Используем быстрый метод вместо полного запуска браузера
         return self.test_video_parameters_fast(video_urls)
 
-    def test_video_parameters_fast(self, video_urls: List[str]) -> pd.DataFrame:
+    def _fetch_video_parameters(self, url: str, headers: Dict[str, str]) -> Dict[str, Any]:
         """
-        Быстрый способ тестирования параметров видео без запуска полного браузера.
-        Использует прямые HTTP запросы для получения данных.
+        Получает параметры одного видео через HTTP-запрос к странице просмотра.
+        Метод не использует драйвер и может выполняться в нескольких потоках одновременно.
         
         Args:
-            video_urls (List[str]): Список URL видео для анализа.
+            url (str): URL видео.
+            headers (Dict[str, str]): Заголовки HTTP-запроса.
             
         Returns:
-            pd.DataFrame: Таблица с параметрами видео (URL, заголовок, дни с момента публикации, просмотры).
+            Dict[str, Any]: Строка результата (URL, заголовок, дни с публикации, просмотры, URL канала, ошибка).
         """
-        logger.info(f"Запуск быстрого тестирования параметров для {len(video_urls)} видео")
-        
-        results = []
-        
-        headers = {
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
-            "Accept-Language": "ru-RU,ru;q=0.9,en-US;q=0.8,en;q=0.7"
-        }
-        
-        for url in video_urls:
+        try:
+            # Извлекаем ID видео из URL
+            video_id = None
+            if "youtube.com/watch?v=" in url:
+                video_id = url.split("watch?v=")[1].split("&")[0]
+            elif "youtu.be/" in url:
+                video_id = url.split("youtu.be/")[1].split("?")[0]
+            
+            if not video_id:
+                logger.warning(f"Не удалось извлечь ID видео из URL: {url}")
+                return {
+                    "URL": url,
+                    "Заголовок": "Ошибка: неверный формат URL",
+                    "Дней с публикации": None,
+                    "Просмотры": None,
+                    "Канал URL": None,
+                    "Ошибка": "Неверный формат URL"
+                }
+            
+            # Формируем URL для запроса
+            request_url = f"https://www.youtube.com/watch?v={video_id}"
+            
+            # Делаем запрос к странице видео
+            response = self.session.get(request_url, headers=headers, timeout=10)
+            
+            if response.status_code != 200:
+                logger.warning(f"Не удалось получить страницу видео, код: {response.status_code}")
+                return {
+                    "URL": url,
+                    "Заголовок": f"Ошибка: код {response.status_code}",
+                    "Дней с публикации": None,
+                    "Просмотры": None,
+                    "Канал URL": None,
+                    "Ошибка": f"Код ответа: {response.status_code}"
+                }
+            
+            html_content = response.text
+            
+            # Извлекаем метаданные из ответа (два подхода)
+            # 1. Через JSON-данные, встроенные в страницу
             try:
-                # Извлекаем ID видео из URL
-                video_id = None
-                if "youtube.com/watch?v=" in url:
-                    video_id = url.split("watch?v=")[1].split("&")[0]
-                elif "youtu.be/" in url:
-                    video_id = url.split("youtu.be/")[1].split("?")[0]
-                
-                if not video_id:
-                    logger.warning(f"Не удалось извлечь ID видео из URL: {url}")
-                    results.append({
-                        "URL": url,
-                        "Заголовок": "Ошибка: неверный формат URL",
-                        "Дней с публикации": None,
-                        "Просмотры": None,
-                        "Канал URL": None,
-                        "Ошибка": "Неверный формат URL"
-                    })
-                    continue
+                # Поиск JSON-данных в HTML
+                player_data = _extract_json_object(html_content, _PLAYER_RESPONSE_RE)
                 
-                # Формируем URL для запроса
-                request_url = f"https://www.youtube.com/watch?v={video_id}"
+                title = None
+                views = None
+                publish_date = None
+                channel_url = None
                 
-                # Делаем запрос к странице видео
-                response = requests.get(request_url, headers=headers, timeout=10)
+                # Проверяем наличие данных о видео через ytInitialPlayerResponse
+                if player_data:
+                    # Извлекаем заголовок
+                    if 'videoDetails' in player_data and 'title' in player_data['videoDetails']:
+                        title = player_data['videoDetails']['title']
+                    
+                    # Извлекаем количество просмотров (как строку)
+                    if 'videoDetails' in player_data and 'viewCount' in player_data['videoDetails']:
+                        views_str = player_data['videoDetails']['viewCount']
+                        views = int(views_str)
+                    
+                    # Извлекаем дату публикации
+                    try:
+                        if 'microformat' in player_data and 'playerMicroformatRenderer' in player_data['microformat']:
+                            micro_format = player_data['microformat']['playerMicroformatRenderer']
+                            if 'publishDate' in micro_format:
+                                publish_date_str = micro_format['publishDate']
+                                publish_date = datetime.strptime(publish_date_str, "%Y-%m-%d")
+                            
+                            # Извлекаем URL канала из microformat
+                            if 'ownerProfileUrl' in micro_format:
+                                channel_url = micro_format['ownerProfileUrl']
+                                if not channel_url.startswith('http'):
+                                    channel_url = 'https://www.youtube.com' + channel_url
+                    except Exception as date_error:
+                        logger.warning(f"Ошибка при обработке даты: {date_error}")
                 
-                if response.status_code != 200:
-                    logger.warning(f"Не удалось получить страницу видео, код: {response.status_code}")
-                    results.append({
-                        "URL": url,
-                        "Заголовок": f"Ошибка: код {response.status_code}",
-                        "Дней с публикации": None,
-                        "Просмотры": None,
-                        "Канал URL": None,
-                        "Ошибка": f"Код ответа: {response.status_code}"
-                    })
-                    continue
+                # Если метаданные не найдены, используем альтернативный метод
+                # ytInitialData (самый большой объект на странице) разбирается только при необходимости
+                data = None
+                if title is None or views is None or publish_date is None or channel_url is None:
+                    data = _extract_json_object(html_content, _INITIAL_DATA_RE)
+                if data:
+                    # Извлекаем заголовок (если не найден ранее)
+                    if title is None:
+                        try:
+                            video_primary_info = None
+                            for renderer in data.get('contents', {}).get('twoColumnWatchNextResults', {}).get('results', {}).get('results', {}).get('contents', []):
+                                if 'videoPrimaryInfoRenderer' in renderer:
+                                    video_primary_info = renderer['videoPrimaryInfoRenderer']
+                                    break
+                            
+                            if video_primary_info and 'title' in video_primary_info:
+                                title_runs = video_primary_info['title'].get('runs', [])
+                                if title_runs:
+                                    title = ''.join(run.get('text', '') for run in title_runs)
+                        except Exception as title_error:
+                            logger.warning(f"Ошибка при извлечении заголовка: {title_error}")
+                    
+                    # Извлекаем URL канала (если не найден ранее)
+                    if channel_url is None:
+                        try:
+                            video_secondary_info = None
+                            for renderer in data.get('contents', {}).get('twoColumnWatchNextResults', {}).get('results', {}).get('results', {}).get('contents', []):
+                                if 'videoSecondaryInfoRenderer' in renderer:
+                                    video_secondary_info = renderer['videoSecondaryInfoRenderer']
+                                    break
+                            
+                            if video_secondary_info and 'owner' in video_secondary_info:
+                                owner_info = video_secondary_info['owner'].get('videoOwnerRenderer', {})
+                                if 'navigationEndpoint' in owner_info:
+                                    browse_endpoint = owner_info['navigationEndpoint'].get('browseEndpoint', {})
+                                    if 'canonicalBaseUrl' in browse_endpoint:
+                                        channel_url = 'https://www.youtube.com' + browse_endpoint['canonicalBaseUrl']
+                                    elif 'browseId' in browse_endpoint:
+                                        channel_url = f"https://www.youtube.com/channel/{browse_endpoint['browseId']}"
+                        except Exception as channel_error:
+                            logger.warning(f"Ошибка при извлечении URL канала: {channel_error}")
+                    
+                    # Извлекаем количество просмотров (если не найдено ранее)
+                    if views is None:
+                        try:
+                            video_primary_info = None
+                            for renderer in data.get('contents', {}).get('twoColumnWatchNextResults', {}).get('results', {}).get('results', {}).get('contents', []):
+                                if 'videoPrimaryInfoRenderer' in renderer:
+                                    video_primary_info = renderer['videoPrimaryInfoRenderer']
+                                    break
+                            
+                            if video_primary_info and 'viewCount' in video_primary_info:
+                                view_count_renderer = video_primary_info['viewCount'].get('videoViewCountRenderer', {})
+                                if 'viewCount' in view_count_renderer:
+                                    views_text = view_count_renderer['viewCount'].get('simpleText', '')
+                                    if not views_text and 'runs' in view_count_renderer['viewCount']:
+                                        views_text = ''.join(run.get('text', '') for run in view_count_renderer['viewCount']['runs'])
+                                    
+                                    # Обработка строки с числом просмотров (форматы: "123 456 просмотров", "123,456 views", "1.2K views" и т.д.)
+                                    views_str = re.sub(r'[^\d.,K]', '', views_text)
+                                    
+                                    # Обработка K, M, B суффиксов
+                                    if 'K' in views_str or 'k' in views_str:
+                                        views_str = views_str.replace('K', '').replace('k', '')
+                                        views = int(float(views_str.replace(',', '.')) * 1000)
+                                    elif 'M' in views_str or 'm' in views_str:
+                                        views_str = views_str.replace('M', '').replace('m', '')
+                                        views = int(float(views_str.replace(',', '.')) * 1000000)
+                                    elif 'B' in views_str or 'b' in views_str:
+                                        views_str = views_str.replace('B', '').replace('b', '')
+                                        views = int(float(views_str.replace(',', '.')) * 1000000000)
+                                    else:
+                                        # Очищаем строку от разделителей
+                                        views_str = views_str.replace(' ', '').replace(',', '')
+                                        views = int(views_str) if views_str else 0
+                        except Exception as views_error:
+                            logger.warning(f"Ошибка при извлечении просмотров: {views_error}")
                 
-                html_content = response.text
+                # Если данные всё ещё не найдены, попробуем извлечь их из метатегов HTML
+                if title is None or views is None or publish_date is None:
+                    # Извлекаем заголовок из метатегов
+                    if title is None:
+                        title_match = re.search(r'<meta\s+name="title"\s+content="([^"]+)"', html_content)
+                        if title_match:
+                            title = title_match.group(1)
+                        else:
+                            # Альтернативный поиск по og:title
+                            title_match = re.search(r'<meta\s+property="og:title"\s+content="([^"]+)"', html_content)
+                            if title_match:
+                                title = title_match.group(1)
+                    
+                    # Поиск даты публикации
+                    if publish_date is None:
+                        date_match = re.search(r'<meta\s+itemprop="datePublished"\s+content="([^"]+)"', html_content)
+                        if date_match:
+                            publish_date_str = date_match.group(1)
+                            try:
+                                if 'T' in publish_date_str:
+                                    publish_date = datetime.strptime(publish_date_str.split('T')[0], "%Y-%m-%d")
+                                else:
+                                    publish_date = datetime.strptime(publish_date_str, "%Y-%m-%d")
+                            except Exception as e:
+                                logger.warning(f"Ошибка при парсинге даты публикации из метатегов: {e}")
+            
+                # Расчет количества дней с момента публикации
+                days_since_publication = None
+                if publish_date:
+                    days_since_publication = (datetime.now() - publish_date).days
+                
+                # Формируем запись для результата
+                result = {
+                    "URL": url,
+                    "Заголовок": title if title else "Нет заголовка",
+                    "Дней с публикации": days_since_publication,
+                    "Просмотры": views if views is not None else 0,
+                    "Канал URL": channel_url,
+                    "Ошибка": None
+                }
                 
-                # Извлекаем метаданные из ответа (два подхода)
-                # 1. Через JSON-данные, встроенные в страницу
+            except Exception as extract_error:
+                logger.error(f"Ошибка при извлечении данных из JSON: {extract_error}")
+                # Резервный метод через регулярные выражения
                 try:
-                    # Поиск JSON-данных в HTML
-                    ytInitialData_match = re.search(r'ytInitialData\s*=\s*({.+?});</script>', html_content)
-                    player_response_match = re.search(r'var ytInitialPlayerResponse\s*=\s*({.+?});</script>', html_content)
+                    # Извлекаем заголовок
+                    title_match = re.search(r'<title>([^<]+)</title>', html_content)
+                    title = title_match.group(1).replace(' - YouTube', '') if title_match else "Нет заголовка"
                     
-                    title = None
-                    views = None
-                    publish_date = None
+                    # Извлекаем URL канала
+                    channel_url_match = re.search(r'<link itemprop="url" href="([^"]+)">', html_content) or re.search(r'<link rel="canonical" href="([^"]+)">', html_content)
                     channel_url = None
+                    if channel_url_match:
+                        channel_url_candidate = channel_url_match.group(1)
+                        if "/channel/" in channel_url_candidate or "/c/" in channel_url_candidate or "/@" in channel_url_candidate:
+                            channel_url = channel_url_candidate
                     
-                    # Проверяем наличие данных о видео через ytInitialPlayerResponse
-                    if player_response_match:
-                        player_data = json.loads(player_response_match.group(1))
-                        
-                        # Извлекаем заголовок
-                        if 'videoDetails' in player_data and 'title' in player_data['videoDetails']:
-                            title = player_data['videoDetails']['title']
-                        
-                        # Извлекаем количество просмотров (как строку)
-                        if 'videoDetails' in player_data and 'viewCount' in player_data['videoDetails']:
-                            views_str = player_data['videoDetails']['viewCount']
+                    # Извлекаем количество просмотров с учетом разных форматов
+                    views_match = re.search(r'"viewCount":\s*"(\d+)"', html_content)
+                    views = int(views_match.group(1)) if views_match else 0
+                    
+                    if not views:
+                        # Альтернативный поиск просмотров
+                        views_match = re.search(r'(\d[\d\s,.]*)\s*просмотр', html_content) or \
+                                    re.search(r'(\d[\d\s,.]*)\s*view', html_content)
+                        if views_match:
+                            views_str = views_match.group(1).replace(' ', '').replace(',', '')
                             views = int(views_str)
-                        
-                        # Извлекаем дату публикации
-                        try:
-                            if 'microformat' in player_data and 'playerMicroformatRenderer' in player_data['microformat']:
-                                micro_format = player_data['microformat']['playerMicroformatRenderer']
-                                if 'publishDate' in micro_format:
-                                    publish_date_str = micro_format['publishDate']
-                                    publish_date = datetime.strptime(publish_date_str, "%Y-%m-%d")
-                                
-                                # Извлекаем URL канала из microformat
-                                if 'ownerProfileUrl' in micro_format:
-                                    channel_url = micro_format['ownerProfileUrl']
-                                    if not channel_url.startswith('http'):
-                                        channel_url = 'https://www.youtube.com' + channel_url
-                        except Exception as date_error:
-                            logger.warning(f"Ошибка при обработке даты: {date_error}")
                     
-                    # Если метаданные не найдены, используем альтернативный метод
-                    if ytInitialData_match and (title is None or views is None or publish_date is None or channel_url is None):
-                        data = json.loads(ytInitialData_match.group(1))
-                        
-                        # Извлекаем заголовок (если не найден ранее)
-                        if title is None:
-                            try:
-                                video_primary_info = None
-                                for renderer in data.get('contents', {}).get('twoColumnWatchNextResults', {}).get('results', {}).get('results', {}).get('contents', []):
-                                    if 'videoPrimaryInfoRenderer' in renderer:
-                                        video_primary_info = renderer['videoPrimaryInfoRenderer']
-                                        break
-                                
-                                if video_primary_info and 'title' in video_primary_info:
-                                    title_runs = video_primary_info['title'].get('runs', [])
-                                    if title_runs:
-                                        title = ''.join(run.get('text', '') for run in title_runs)
-                            except Exception as title_error:
-                                logger.warning(f"Ошибка при извлечении заголовка: {title_error}")
-                        
-                        # Извлекаем URL канала (если не найден ранее)
-                        if channel_url is None:
-                            try:
-                                video_secondary_info = None
-                                for renderer in data.get('contents', {}).get('twoColumnWatchNextResults', {}).get('results', {}).get('results', {}).get('contents', []):
-                                    if 'videoSecondaryInfoRenderer' in renderer:
-                                        video_secondary_info = renderer['videoSecondaryInfoRenderer']
-                                        break
-                                
-                                if video_secondary_info and 'owner' in video_secondary_info:
-                                    owner_info = video_secondary_info['owner'].get('videoOwnerRenderer', {})
-                                    if 'navigationEndpoint' in owner_info:
-                                        browse_endpoint = owner_info['navigationEndpoint'].get('browseEndpoint', {})
-                                        if 'canonicalBaseUrl' in browse_endpoint:
-                                            channel_url = 'https://www.youtube.com' + browse_endpoint['canonicalBaseUrl']
-                                        elif 'browseId' in browse_endpoint:
-                                            channel_url = f"https://www.youtube.com/channel/{browse_endpoint['browseId']}"
-                            except Exception as channel_error:
-                                logger.warning(f"Ошибка при извлечении URL канала: {channel_error}")
-                        
-                        # Извлекаем количество просмотров (если не найдено ранее)
-                        if views is None:
-                            try:
-                                video_primary_info = None
-                                for renderer in data.get('contents', {}).get('twoColumnWatchNextResults', {}).get('results', {}).get('results', {}).get('contents', []):
-                                    if 'videoPrimaryInfoRenderer' in renderer:
-                                        video_primary_info = renderer['videoPrimaryInfoRenderer']
-                                        break
-                                
-                                if video_primary_info and 'viewCount' in video_primary_info:
-                                    view_count_renderer = video_primary_info['viewCount'].get('videoViewCountRenderer', {})
-                                    if 'viewCount' in view_count_renderer:
-                                        views_text = view_count_renderer['viewCount'].get('simpleText', '')
-                                        if not views_text and 'runs' in view_count_renderer['viewCount']:
-                                            views_text = ''.join(run.get('text', '') for run in view_count_renderer['viewCount']['runs'])
-                                        
-                                        # Обработка строки с числом просмотров (форматы: "123 456 просмотров", "123,456 views", "1.2K views" и т.д.)
-                                        views_str = re.sub(r'[^\d.,K]', '', views_text)
-                                        
-                                        # Обработка K, M, B суффиксов
-                                        if 'K' in views_str or 'k' in views_str:
-                                            views_str = views_str.replace('K', '').replace('k', '')
-                                            views = int(float(views_str.replace(',', '.')) * 1000)
-                                        elif 'M' in views_str or 'm' in views_str:
-                                            views_str = views_str.replace('M', '').replace('m', '')
-                                            views = int(float(views_str.replace(',', '.')) * 1000000)
-                                        elif 'B' in views_str or 'b' in views_str:
-                                            views_str = views_str.replace('B', '').replace('b', '')
-                                            views = int(float(views_str.replace(',', '.')) * 1000000000)
-                                        else:
-                                            # Очищаем строку от разделителей
-                                            views_str = views_str.replace(' ', '').replace(',', '')
-                                            views = int(views_str) if views_str else 0
-                            except Exception as views_error:
-                                logger.warning(f"Ошибка при извлечении просмотров: {views_error}")
-                    
-                    # Если данные всё ещё не найдены, попробуем извлечь их из метатегов HTML
-                    if title is None or views is None or publish_date is None:
-                        # Извлекаем заголовок из метатегов
-                        if title is None:
-                            title_match = re.search(r'<meta\s+name="title"\s+content="([^"]+)"', html_content)
-                            if title_match:
-                                title = title_match.group(1)
-                            else:
-                                # Альтернативный поиск по og:title
-                                title_match = re.search(r'<meta\s+property="og:title"\s+content="([^"]+)"', html_content)
-                                if title_match:
-                                    title = title_match.group(1)
-                        
-                        # Поиск даты публикации
-                        if publish_date is None:
-                            date_match = re.search(r'<meta\s+itemprop="datePublished"\s+content="([^"]+)"', html_content)
-                            if date_match:
-                                publish_date_str = date_match.group(1)
-                                try:
-                                    if 'T' in publish_date_str:
-                                        publish_date = datetime.strptime(publish_date_str.split('T')[0], "%Y-%m-%d")
-                                    else:
-                                        publish_date = datetime.strptime(publish_date_str, "%Y-%m-%d")
-                                except Exception as e:
-                                    logger.warning(f"Ошибка при парсинге даты публикации из метатегов: {e}")
-                
-                    # Расчет количества дней с момента публикации
+                    # Извлекаем дату публикации
+                    date_match = re.search(r'"publishDate":\s*"([^"]+)"', html_content)
+                    publish_date = None
                     days_since_publication = None
-                    if publish_date:
-                        days_since_publication = (datetime.now() - publish_date).days
                     
-                    # Формируем запись для результата
+                    if date_match:
+                        publish_date_str = date_match.group(1)
+                        try:
+                            publish_date = datetime.strptime(publish_date_str.split('T')[0], "%Y-%m-%d")
+                            days_since_publication = (datetime.now() - publish_date).days
+                        except Exception as date_error:
+                            logger.warning(f"Ошибка при парсинге даты публикации: {date_error}")
+                    
                     result = {
                         "URL": url,
-                        "Заголовок": title if title else "Нет заголовка",
+                        "Заголовок": title,
                         "Дней с публикации": days_since_publication,
-                        "Просмотры": views if views is not None else 0,
+                        "Просмотры": views,
                         "Канал URL": channel_url,
                         "Ошибка": None
                     }
                     
-                except Exception as extract_error:
-                    logger.error(f"Ошибка при извлечении данных из JSON: {extract_error}")
-                    # Резервный метод через регулярные выражения
-                    try:
-                        # Извлекаем заголовок
-                        title_match = re.search(r'<title>([^<]+)</title>', html_content)
-                        title = title_match.group(1).replace(' - YouTube', '') if title_match else "Нет заголовка"
-                        
-                        # Извлекаем URL канала
-                        channel_url_match = re.search(r'<link itemprop="url" href="([^"]+)">', html_content) or re.search(r'<link rel="canonical" href="([^"]+)">', html_content)
-                        channel_url = None
-                        if channel_url_match:
-                            channel_url_candidate = channel_url_match.group(1)
-                            if "/channel/" in channel_url_candidate or "/c/" in channel_url_candidate or "/@" in channel_url_candidate:
-                                channel_url = channel_url_candidate
-                        
-                        # Извлекаем количество просмотров с учетом разных форматов
-                        views_match = re.search(r'"viewCount":\s*"(\d+)"', html_content)
-                        views = int(views_match.group(1)) if views_match else 0
-                        
-                        if not views:
-                            # Альтернативный поиск просмотров
-                            views_match = re.search(r'(\d[\d\s,.]*)\s*просмотр', html_content) or \
-                                        re.search(r'(\d[\d\s,.]*)\s*view', html_content)
-                            if views_match:
-                                views_str = views_match.group(1).replace(' ', '').replace(',', '')
-                                views = int(views_str)
-                        
-                        # Извлекаем дату публикации
-                        date_match = re.search(r'"publishDate":\s*"([^"]+)"', html_content)
-                        publish_date = None
-                        days_since_publication = None
-                        
-                        if date_match:
-                            publish_date_str = date_match.group(1)
-                            try:
-                                publish_date = datetime.strptime(publish_date_str.split('T')[0], "%Y-%m-%d")
-                                days_since_publication = (datetime.now() - publish_date).days
-                            except Exception as date_error:
-                                logger.warning(f"Ошибка при парсинге даты публикации: {date_error}")
-                        
-                        result = {
-                            "URL": url,
-                            "Заголовок": title,
-                            "Дней с публикации": days_since_publication,
-                            "Просмотры": views,
-                            "Канал URL": channel_url,
-                            "Ошибка": None
-                        }
-                        
-                    except Exception as regex_error:
-                        logger.error(f"Ошибка при извлечении данных через регулярные выражения: {regex_error}")
-                        result = {
-                            "URL": url,
-                            "Заголовок": "Ошибка при извлечении данных",
-                            "Дней с публикации": None,
-                            "Просмотры": None,
-                            "Канал URL": None,
-                            "Ошибка": str(extract_error)
-                        }
-                
-                results.append(result)
-                
-            except Exception as e:
-                logger.error(f"Ошибка при анализе видео {url}: {e}")
-                results.append({
-                    "URL": url,
-                    "Заголовок": "Ошибка",
-                    "Дней с публикации": None,
-                    "Просмотры": None,
-                    "Канал URL": None,
-                    "Ошибка": str(e)
-                })
+                except Exception as regex_error:
+                    logger.error(f"Ошибка при извлечении данных через регулярные выражения: {regex_error}")
+                    result = {
+                        "URL": url,
+                        "Заголовок": "Ошибка при извлечении данных",
+                        "Дней с публикации": None,
+                        "Просмотры": None,
+                        "Канал URL": None,
+                        "Ошибка": str(extract_error)
+                    }
+            
+            return result
+            
+        except Exception as e:
+            logger.error(f"Ошибка при анализе видео {url}: {e}")
+            return {
+                "URL": url,
+                "Заголовок": "Ошибка",
+                "Дней с публикации": None,
+                "Просмотры": None,
+                "Канал URL": None,
+                "Ошибка": str(e)
+            }
+
+    def test_video_parameters_fast(self, video_urls: List[str]) -> pd.DataFrame:
+        """
+        Быстрый способ тестирования параметров видео без запуска полного браузера.
+        Использует прямые HTTP запросы для получения данных.
+        
+        Args:
+            video_urls (List[str]): Список URL видео для анализа.
+            
+        Returns:
+            pd.DataFrame: Таблица с параметрами видео (URL, заголовок, дни с момента публикации, просмотры).
+        """
+        logger.info(f"Запуск быстрого тестирования параметров для {len(video_urls)} видео")
+        
+        # Заранее выделяем по списку на каждую колонку и заполняем их по позиции видео,
+        # чтобы не держать в памяти одновременно список словарей и итоговый DataFrame
+        n = len(video_urls)
+        columns = {name: [None] * n for name in ("URL", "Заголовок", "Дней с публикации", "Просмотры", "Канал URL", "Ошибка")}
+        
+        def store_result(idx: int, result: Dict[str, Any]) -> None:
+            for name, values in columns.items():
+                values[idx] = result.get(name)
+        
+        headers = {
+            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
+            "Accept-Language": "ru-RU,ru;q=0.9,en-US;q=0.8,en;q=0.7"
+        }
+        
+        # Страницы видео загружаются параллельно: каждый запрос ждет в основном сеть,
+        # а результаты раскладываются по позициям, поэтому порядок строк совпадает с video_urls
+        if n > 1:
+            with concurrent.futures.ThreadPoolExecutor(max_workers=min(_VIDEO_PARAMS_WORKERS, n)) as executor:
+                for idx, result in enumerate(executor.map(lambda video_url: self._fetch_video_parameters(video_url, headers), video_urls)):
+                    store_result(idx, result)
+        else:
+            for idx, url in enumerate(video_urls):
+                store_result(idx, self._fetch_video_parameters(url, headers))
         
         # Создаем DataFrame с результатами
-        df = pd.DataFrame(results)
+        df = pd.DataFrame(columns)
+        
+        # Сохраняем числовые данные перед форматированием: колонки приводятся к числам
+        # один раз, пустые значения становятся NaN. Числовые колонки есть в результате всегда,
+        # в том числе у пустой таблицы, поэтому вызывающему коду не нужен разбор строк
+        views = pd.to_numeric(df["Просмотры"], errors="coerce")
+        days = pd.to_numeric(df["Дней с публикации"], errors="coerce")
+        df["Просмотры_число"] = views
+        df["Дней_число"] = days
         
         # Форматируем данные для читаемости
         try:
             if not df.empty:
-                # Сохраняем оригинальные данные перед форматированием
-                df["Просмотры_число"] = df["Просмотры"]
-                
-                # Форматируем количество просмотров для удобного отображения
-                df["Просмотры"] = df["Просмотры"].apply(
-                    lambda x: f"{x:,}".replace(",", " ") if pd.notna(x) else "—"
-                )
+                # Форматируем количество просмотров для удобного отображения (пропуски - "—").
+                # Формат с .0f не дает хвоста ".0", когда пропуски превращают колонку во float
+                df["Просмотры"] = views.map("{:,.0f}".format, na_action="ignore").fillna("—").str.replace(",", " ")
                 
                 # Форматируем дни с публикации
-                df["Дней с публикации"] = df["Дней с публикации"].apply(
-                    lambda x: f"{int(x)}" if pd.notna(x) else "—"
-                )
+                df["Дней с публикации"] = days.map("{:.0f}".format, na_action="ignore").fillna("—")
         except Exception as e:
             logger.warning(f"Ошибка при форматировании данных: {e}")
         
-        logger.info(f"Тестирование параметров видео завершено. Проанализировано {len(results)} видео.")
+        logger.info(f"Тестирование параметров видео завершено. Проанализировано {n} видео.")
         
         return df
 
@@ -3467,6 +3697,7 @@ class YouTubeAnalyzer:
             List[Dict[str, Any]]: Список рекомендованных видео.
         """
         recommendations = []
+        seen_urls = set()  # URL уже добавленных рекомендаций для проверки дубликатов за O(1)
         start_time = time.time()
         logger.info(f"Быстрое получение рекомендаций для видео: {video_url}")
         
@@ -3501,7 +3732,7 @@ class YouTubeAnalyzer:
             
             # Делаем запрос к странице видео
             logger.info(f"Отправка HTTP-запроса для получения страницы видео: {request_url}")
-            response = requests.get(request_url, headers=headers, proxies=proxies, timeout=10)
+            response = self.session.get(request_url, headers=headers, proxies=proxies, timeout=10)
             request_time = time.time() - start_time
             logger.info(f"Получен ответ за {request_time:.2f} сек, код: {response.status_code}")
             
@@ -3514,38 +3745,34 @@ class YouTubeAnalyzer:
             
             # Извлекаем рекомендации из HTML: два подхода
             # 1. Через регулярные выражения для поиска ссылок на видео
-            video_urls = set()  # Используем множество для избежания дубликатов
+            # Словарь как упорядоченное множество: без дубликатов и в порядке появления на странице,
+            # чтобы выбор первых limit рекомендаций был воспроизводимым (порядок обхода set
+            # зависит от рандомизации хэшей строк и меняется между запусками)
+            video_urls = {}
             
             # Поиск ссылок на видео через регулярные выражения
             logger.info("Извлечение рекомендаций из HTML с помощью регулярных выражений")
             regex_start_time = time.time()
             
-            # Ищем все URL видео в HTML
-            url_patterns = [
-                r'href=\"(/watch\?v=[^\"&]+)',  # Ссылки на видео в стандартном формате
-                r'videoId\":\"([a-zA-Z0-9_-]{11})\"',  # ID видео в JSON-данных
-                r'watchEndpoint\":{\"videoId\":\"([a-zA-Z0-9_-]{11})\"'  # ID видео в данных рекомендаций
-            ]
-            
-            for pattern in url_patterns:
-                matches = re.findall(pattern, html_content)
-                for match in matches:
-                    if len(match) == 11 and not match.startswith('/'):  # Прямой ID видео
-                        full_url = f"https://www.youtube.com/watch?v={match}"
-                        video_urls.add(full_url)
-                    elif match.startswith('/watch?v='):  # Относительный URL
-                        full_url = f"https://www.youtube.com{match}"
-                        video_urls.add(full_url)
+            # Ищем все URL видео в HTML за один проход. Порядок прежний: сначала ссылки href,
+            # затем ID из JSON (ID из watchEndpoint входят в общий список videoId)
+            href_urls = []
+            id_urls = []
+            for href, video_id_match in _WATCH_LINK_RE.findall(html_content):
+                if href:
+                    href_urls.append(f"https://www.youtube.com{href}")
+                else:
+                    id_urls.append(f"https://www.youtube.com/watch?v={video_id_match}")
+            video_urls.update(dict.fromkeys(href_urls))
+            video_urls.update(dict.fromkeys(id_urls))
             
             # 2. Через JSON-данные, встроенные в страницу
             try:
                 # Ищем ytInitialData, содержащий информацию о рекомендациях
                 json_start_time = time.time()
-                json_data_match = re.search(r'ytInitialData\s*=\s*({.+?});</script>', html_content)
+                data = _extract_json_object(html_content, _INITIAL_DATA_RE)
                 
-                if json_data_match:
-                    data = json.loads(json_data_match.group(1))
-                    
+                if data:
                     # Извлекаем рекомендации из секции secondary results (справа от видео)
                     secondary_results = None
                     try:
@@ -3570,11 +3797,10 @@ class YouTubeAnalyzer:
                                             title = ''.join(run.get('text', '') for run in title_runs)
                                             
                                         full_url = f"https://www.youtube.com/watch?v={video_id}"
-                                        if title:
-                                            video_urls.add(full_url)
+                                        video_urls[full_url] = None
+                                        if title and full_url not in seen_urls:
+                                            seen_urls.add(full_url)
                                             recommendations.append({"url": full_url, "title": title})
-                                        else:
-                                            video_urls.add(full_url)
                             except Exception as item_error:
                                 logger.warning(f"Ошибка при обработке элемента рекомендации: {item_error}")
                                 continue
@@ -3586,6 +3812,10 @@ class YouTubeAnalyzer:
             
             # Для всех URL из регулярных выражений, которых нет в recommendations, добавляем их
             for url in video_urls:
+                # Нужное количество уже набрано - остальные URL все равно были бы отброшены срезом
+                if len(recommendations) >= limit:
+                    break
+                
                 # Пропускаем текущее видео
                 if url == video_url:
                     continue
@@ -3595,18 +3825,12 @@ class YouTubeAnalyzer:
                     continue
                     
                 # Проверяем, есть ли уже этот URL в рекомендациях
-                if not any(rec.get("url") == url for rec in recommendations):
+                if url not in seen_urls:
+                    seen_urls.add(url)
                     recommendations.append({"url": url})
             
-            # Удаляем дубликаты, сохраняя порядок
-            unique_recommendations = []
-            seen_urls = set()
-            for rec in recommendations:
-                if rec["url"] not in seen_urls:
-                    seen_urls.add(rec["url"])
-                    unique_recommendations.append(rec)
-            
-            recommendations = unique_recommendations[:limit]
+            # Дубликаты отсеяны при добавлении, порядок сохранен
+            recommendations = recommendations[:limit]
             
             total_time = time.time() - start_time
             logger.info(f"Быстрое получение рекомендаций заняло {total_time:.2f} сек, найдено {len(recommendations)} рекомендаций")
@@ -3615,8 +3839,7 @@ class YouTubeAnalyzer:
             
         except Exception as e:
             total_time = time.time() - start_time
-            logger.error(f"Ошибка при быстром получении рекомендаций для {video_url}: {e} (за {total_time:.2f} сек)")
-            traceback.print_exc()
+            logger.exception(f"Ошибка при быстром получении рекомендаций для {video_url}: {e} (за {total_time:.2f} сек)")
             return []
 
 def check_proxy(proxy_string: str) -> Tuple[bool, str]:
@@ -3634,46 +3857,44 @@ def check_proxy(proxy_string: str) -> Tuple[bool, str]:
         return False, f"Неверный формат прокси: {proxy_string}. Ожидается формат ip:port:username:password"
     
     ip, port, username, password = parts
+    # Ответ прямого соединения; остаётся пустым, если подключиться к прокси не удалось
+    response_text = ""
     
     # Метод 1: Прямое соединение через сокет
     try:
-        # Подключаемся напрямую к прокси
-        s = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        s.settimeout(5)
-        s.connect((ip, int(port)))
-        
-        logger.info(f"Установлено соединение с {ip}:{port}")
+        # Подключаемся напрямую к прокси; контекстный менеджер закрывает сокет и при ошибке,
+        # чтобы при параллельной проверке неудачные соединения не копили открытые дескрипторы
+        with socket.create_connection((ip, int(port)), timeout=5) as s:
+            logger.info(f"Установлено соединение с {ip}:{port}")
         
-        # Формируем HTTP запрос через прокси
-        auth_header = f"Proxy-Authorization: Basic {base64.b64encode(f'{username}:{password}'.encode()).decode()}\r\n"
+            # Формируем HTTP запрос через прокси
+            auth_header = f"Proxy-Authorization: Basic {base64.b64encode(f'{username}:{password}'.encode()).decode()}\r\n"
         
-        # Важно! Используем HTTP вместо HTTPS для проверки
-        http_request = (
-            f"GET http://example.com/ HTTP/1.1\r\n"
-            f"Host: example.com\r\n"
-            f"{auth_header}"
-            f"User-Agent: Mozilla/5.0 (Windows NT 10.0; Win64; x64) Chrome/120.0.0.0\r\n"
-            f"Accept: text/html\r\n"
-            f"Connection: close\r\n\r\n"
-        )
+            # Важно! Используем HTTP вместо HTTPS для проверки
+            http_request = (
+                f"GET http://example.com/ HTTP/1.1\r\n"
+                f"Host: example.com\r\n"
+                f"{auth_header}"
+                f"User-Agent: Mozilla/5.0 (Windows NT 10.0; Win64; x64) Chrome/120.0.0.0\r\n"
+                f"Accept: text/html\r\n"
+                f"Connection: close\r\n\r\n"
+            )
         
-        # Отправляем запрос
-        s.sendall(http_request.encode())
+            # Отправляем запрос
+            s.sendall(http_request.encode())
         
-        # Получаем ответ
-        response = b""
-        s.settimeout(3)
+            # Получаем ответ
+            response = b""
+            s.settimeout(3)
         
-        try:
-            while True:
-                data = s.recv(4096)
-                if not data:
-                    break
-                response += data
-        except socket.timeout:
-            pass
-            
-        s.close()
+            try:
+                while True:
+                    data = s.recv(4096)
+                    if not data:
+                        break
+                    response += data
+            except socket.timeout:
+                pass
         
         # Декодируем ответ
         response_text = response.decode("utf-8", errors="ignore")
@@ -3751,6 +3972,37 @@ def check_proxy(proxy_string: str) -> Tuple[bool, str]:
         return False, f"Ошибка при проверке прокси {ip}:{port}: {e}"
 
 
+@st.cache_resource(show_spinner=False)
+def get_api_analyzer() -> YouTubeAnalyzer:
+    """
+    Возвращает анализатор YouTube без браузера для запросов к YouTube Data API.
+    Экземпляр создается один раз на процесс и переиспользуется между перезапусками скрипта
+    Streamlit: драйвер у него не запускается, а HTTP-запросы идут через общую сессию.
+    
+    Returns:
+        YouTubeAnalyzer: Анализатор для работы с API.
+    """
+    return YouTubeAnalyzer(headless=True, use_proxy=False)
+
+
+@st.cache_data(ttl=300, show_spinner=False)
+def _probe_proxies(proxy_strings: Tuple[str, ...]) -> List[Tuple[bool, str]]:
+    """
+    Параллельно проверяет прокси; результат кэшируется на 5 минут,
+    чтобы перезапуски скрипта Streamlit не повторяли проверку.
+    
+    Args:
+        proxy_strings: Кортеж строк с прокси в формате "ip:port:username:password"
+        
+    Returns:
+        List[Tuple[bool, str]]: Результаты check_proxy в порядке входного списка
+    """
+    if not proxy_strings:
+        return []
+    with concurrent.futures.ThreadPoolExecutor(max_workers=min(32, len(proxy_strings))) as executor:
+        return list(executor.map(check_proxy, proxy_strings))
+
+
 def test_proxies(proxy_list: List[str]) -> List[Dict]:
     """
     Тестирует список прокси и возвращает работающие
@@ -3762,20 +4014,19 @@ def test_proxies(proxy_list: List[str]) -> List[Dict]:
         List[Dict]: Список словарей с информацией о работающих прокси
     """
     working_proxies = []
-    results = []
     
-    print(f"Проверка {len(proxy_list)} прокси-серверов...")
+    logger.info(f"Проверка {len(proxy_list)} прокси-серверов...")
+    
+    # Все прокси проверяются одновременно, результаты выводятся одним проходом.
+    # В кэшируемую проверку передается отсортированный список без повторов: тот же набор
+    # прокси в другом порядке берется из кэша, а повторяющиеся строки не проверяются дважды
+    unique_proxies = tuple(sorted(set(proxy_list)))
+    probe_by_proxy = dict(zip(unique_proxies, _probe_proxies(unique_proxies)))
     
     for proxy_string in proxy_list:
-        is_working, message = check_proxy(proxy_string)
-        
-        proxy_info = {
-            "proxy_string": proxy_string,
-            "is_working": is_working,
-            "message": message
-        }
-        
-        results.append(proxy_info)
+        is_working, message = probe_by_proxy[proxy_string]
+        status = "✅ РАБОТАЕТ" if is_working else "❌ НЕ РАБОТАЕТ"
+        logger.info(f"{status}: {proxy_string} - {message}")
         
         # Разбиваем строку прокси для удобства
         if is_working:
@@ -3791,13 +4042,7 @@ def test_proxies(proxy_list: List[str]) -> List[Dict]:
                 }
                 working_proxies.append(working_proxy)
     
-    # Выводим результаты
-    print("\nРезультаты проверки прокси:")
-    for result in results:
-        status = "✅ РАБОТАЕТ" if result["is_working"] else "❌ НЕ РАБОТАЕТ"
-        print(f"{status}: {result['proxy_string']} - {result['message']}")
-    
-    print(f"\nВсего рабочих прокси: {len(working_proxies)} из {len(proxy_list)}")
+    logger.info(f"Всего рабочих прокси: {len(working_proxies)} из {len(proxy_list)}")
     return working_proxies
 
 # Пример использования
@@ -3880,8 +4125,6 @@ if __name__ == "__main__":
             analyzer.quit_driver()
             
         except Exception as e:
-            print(f"Ошибка при анализе видео: {e}")
-            import traceback
-            traceback.print_exc()
+            logger.exception(f"Ошибка при анализе видео: {e}")
     
     print("Работа скрипта завершена")
\ No newline at end of file